@@ -3,15 +3,146 @@ SOS Game AI Logic - INSTANT VERSION
 AI yang memberikan respons instant tanpa delay
 """
 
+import os
 import random
+import time
 from player import Player
+from board import SOSBoard
+
+# numba takes ~0.4s to import; SOS_NO_NUMBA=1 skips it (pure Python search)
+try:
+    if os.environ.get("SOS_NO_NUMBA"):
+        raise ImportError("numba disabled by SOS_NO_NUMBA")
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+    
+    def njit(*args, **kwargs):
+        """Fallback when numba is missing: run the plain Python function"""
+        return lambda func: func
+
+# Negamax search depth (in single letter placements); easy does not search
+SEARCH_DEPTH = {"medium": 3, "hard": 5}
+# Wall-clock budget (seconds) for the iterative deepening search
+SEARCH_BUDGET = 0.05
+
+# Transposition table bound flags and size cap (oldest entries evicted first)
+TT_EXACT, TT_LOWER, TT_UPPER = 0, 1, 2
+TT_MAX_ENTRIES = 200000
+
+# Remaining depth at which the search hands off to negamax_bits (numba only)
+KERNEL_DEPTH = 3
+SCORE_INF = 1 << 20
+
+# (row, col, letter) -> suggest_move explanation, formatted once per move
+_EXPLANATIONS = {}
+
+@njit(cache=True, nogil=True)
+def scoring_masks(s_bits, o_bits, empty_mask, shifts):
+    """Masks of empty cells where placing S / O completes an SOS
+    
+    shifts is SOSBoard._shifts: (step, start_mask) per direction.
+    """
+    win_s = 0
+    win_o = 0
+    for step, start_mask in shifts:
+        # S at start: _ O S
+        win_s |= empty_mask & (o_bits >> step) & (s_bits >> (2 * step)) & start_mask
+        # S at end: S O _
+        win_s |= (s_bits & (o_bits >> step) & (empty_mask >> (2 * step)) & start_mask) << (2 * step)
+        # O in middle: S _ S
+        win_o |= (s_bits & (empty_mask >> step) & (s_bits >> (2 * step)) & start_mask) << step
+    return win_s, win_o
+
+# The uncompiled scoring_masks, for boards wider than the kernels' int64 math
+_scoring_masks_py = getattr(scoring_masks, 'py_func', scoring_masks)
+
+@njit(cache=True, nogil=True)
+def count_sos_bits(s_bits, o_bits, bit, shifts):
+    """Number of S-O-S lines through the (already placed) cell at bit"""
+    count = 0
+    for step, start_mask in shifts:
+        hits = s_bits & (o_bits >> step) & (s_bits >> (2 * step)) & start_mask
+        hits &= bit | (bit >> step) | (bit >> (2 * step))
+        while hits:
+            hits &= hits - 1
+            count += 1
+    return count
+
+# Not cached: numba's on-disk cache does not cope with self-recursion
+@njit(nogil=True)
+def negamax_bits(s_bits, o_bits, empty_mask, depth, alpha, beta, shifts):
+    """Alpha-beta negamax over raw bitboards, same scoring as AIPlayer._negamax
+    
+    Moves that complete an SOS are searched first, then quiet moves.
+    """
+    if depth == 0 or empty_mask == 0:
+        return 0
+    
+    win_s, win_o = scoring_masks(s_bits, o_bits, empty_mask, shifts)
+    best = -SCORE_INF
+    
+    # Scoring moves: the same player moves again
+    for letter in range(2):
+        mask = win_s if letter == 0 else win_o
+        while mask:
+            bit = mask & -mask
+            mask ^= bit
+            if letter == 0:
+                new_s, new_o = s_bits | bit, o_bits
+            else:
+                new_s, new_o = s_bits, o_bits | bit
+            points = count_sos_bits(new_s, new_o, bit, shifts)
+            score = points + negamax_bits(new_s, new_o, empty_mask ^ bit, depth - 1,
+                                          alpha - points, beta - points, shifts)
+            if score > best:
+                best = score
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                return best
+    
+    # Quiet moves: the turn passes
+    for letter in range(2):
+        mask = empty_mask & ~(win_s if letter == 0 else win_o)
+        while mask:
+            bit = mask & -mask
+            mask ^= bit
+            if letter == 0:
+                new_s, new_o = s_bits | bit, o_bits
+            else:
+                new_s, new_o = s_bits, o_bits | bit
+            score = -negamax_bits(new_s, new_o, empty_mask ^ bit, depth - 1,
+                                  -beta, -alpha, shifts)
+            if score > best:
+                best = score
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                return best
+    
+    return best
+
+class _SearchTimeout(Exception):
+    """Raised inside the search once the move's time budget is spent"""
 
 class AIPlayer(Player):
     """AI Player with instant response - NO DELAYS"""
+    __slots__ = ('difficulty', '_rng', '_tt')
     
-    def __init__(self, name="AI", difficulty="medium"):
+    def __init__(self, name="AI", difficulty="medium", seed=None):
         super().__init__(name)
         self.difficulty = difficulty
+        # Private generator: no shared module state, reproducible with a seed
+        self._rng = random.Random(seed)
+        # Zobrist hash -> (depth, flag, score, best_move)
+        self._tt = {}
+        if HAVE_NUMBA:
+            # Compile (or load the cached build of) the kernels up front
+            dummy = SOSBoard()
+            negamax_bits(dummy.s_bits, dummy.o_bits, dummy.empty_mask, 1,
+                         -SCORE_INF, SCORE_INF, dummy._shifts)
     
     def get_move(self, board):
         """Get AI's next move - INSTANT NO THINKING TIME"""
@@ -20,6 +151,12 @@ class AIPlayer(Player):
         if not empty_cells:
             return None, None, None
         
+        # Medium/Hard: alpha-beta search
+        if self.difficulty in ("medium", "hard"):
+            move = self._iterative_deepening(board)
+            if move:
+                return move
+        
         # INSTANT Step 1: Check for immediate win (first 3 cells only)
         for i, (row, col) in enumerate(empty_cells):
             if i >= 3:  # Only check first 3 positions
@@ -31,97 +168,205 @@ class AIPlayer(Player):
             if self._can_win_here(board, row, col, 'O'):
                 return row, col, 'O'
         
-        # INSTANT Step 2: Quick block (only if hard mode)
-        if self.difficulty == "hard":
-            for i, (row, col) in enumerate(empty_cells):
-                if i >= 2:  # Only check first 2 positions
-                    break
-                if self._should_block_here(board, row, col):
-                    return row, col, random.choice(['S', 'O'])
-        
-        # INSTANT Step 3: Strategic positioning
+        # INSTANT Step 2: Strategic positioning
         move = self._get_quick_strategic_move(board, empty_cells)
         if move:
             return move
         
-        # INSTANT Step 4: Random fallback
-        row, col = random.choice(empty_cells)
-        letter = random.choice(['S', 'O'])
+        # INSTANT Step 3: Random fallback
+        row, col = empty_cells[self._rng.randrange(len(empty_cells))]
+        letter = 'S' if self._rng.getrandbits(1) else 'O'
         return row, col, letter
     
-    def _can_win_here(self, board, row, col, letter):
-        """Check if placing letter here creates SOS - NO BOARD COPY"""
-        directions = [(0, 1), (1, 0), (1, 1), (1, -1)]  # horizontal, vertical, diagonal
+    def _iterative_deepening(self, board):
+        """Search depth 1, 2, ... up to SEARCH_DEPTH within SEARCH_BUDGET
         
-        for dr, dc in directions:
-            if self._check_sos_pattern(board, row, col, letter, dr, dc):
-                return True
-        return False
+        Returns the best move of the deepest completed iteration. Each
+        iteration leaves its best moves in the transposition table, which
+        orders the next, deeper one. Depth 1 always runs to completion.
+        """
+        deadline = time.perf_counter() + SEARCH_BUDGET
+        best_move = None
+        
+        for depth in range(1, SEARCH_DEPTH[self.difficulty] + 1):
+            try:
+                _, move = self._negamax(board, depth, -SCORE_INF, SCORE_INF,
+                                        deadline if depth > 1 else float('inf'))
+            except _SearchTimeout:
+                break
+            best_move = move
+        return best_move
     
-    def _check_sos_pattern(self, board, row, col, letter, dr, dc):
-        """Check SOS pattern in one direction - ULTRA FAST"""
-        if letter == 'S':
-            # S at start: S-O-S
-            if (self._valid_and_equals(board, row + dr, col + dc, 'O') and
-                self._valid_and_equals(board, row + 2*dr, col + 2*dc, 'S')):
-                return True
-            # S at end: S-O-S
-            if (self._valid_and_equals(board, row - dr, col - dc, 'O') and
-                self._valid_and_equals(board, row - 2*dr, col - 2*dc, 'S')):
-                return True
+    def _negamax(self, board, depth, alpha, beta, deadline):
+        """Alpha-beta negamax search, returns (score, move)
         
-        elif letter == 'O':
-            # O in middle: S-O-S
-            if (self._valid_and_equals(board, row - dr, col - dc, 'S') and
-                self._valid_and_equals(board, row + dr, col + dc, 'S')):
-                return True
+        score is the net number of SOS the player to move can gain over
+        the opponent within depth placements. Completing an SOS earns
+        another turn, so that child is searched for the same player
+        (window shifted by the points) instead of being negated.
         
-        return False
+        Both players may place either letter, so a position's score does
+        not depend on who is to move and the transposition table is keyed
+        on the board's Zobrist hash alone.
+        
+        Raises _SearchTimeout once time.perf_counter() passes deadline.
+        """
+        if depth == 0 or board.is_full():
+            # Points are counted along the path, so a leaf is even
+            return 0, None
+        if time.perf_counter() > deadline:
+            raise _SearchTimeout
+        
+        alpha_orig = alpha
+        key = board._zobrist
+        entry = self._tt.get(key)
+        tt_move = None
+        if entry is not None:
+            entry_depth, flag, value, tt_move = entry
+            if entry_depth >= depth:
+                if flag == TT_EXACT:
+                    return value, tt_move
+                if flag == TT_LOWER:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value, tt_move
+        
+        best_score = -SCORE_INF
+        best_move = None
+        
+        for _, row, col, letter in self._ordered_moves(board, tt_move):
+            points = board.make_move(row, col, letter)
+            try:
+                if points:
+                    score = points + self._search_child(board, depth - 1, alpha - points,
+                                                        beta - points, deadline)
+                else:
+                    score = -self._search_child(board, depth - 1, -beta, -alpha, deadline)
+            finally:
+                board.unmake_move()
+            
+            if score > best_score:
+                best_score = score
+                best_move = (row, col, letter)
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break  # Beta cutoff
+        
+        if best_score <= alpha_orig:
+            flag = TT_UPPER
+        elif best_score >= beta:
+            flag = TT_LOWER
+        else:
+            flag = TT_EXACT
+        if len(self._tt) >= TT_MAX_ENTRIES:
+            del self._tt[next(iter(self._tt))]
+        self._tt[key] = (depth, flag, best_score, best_move)
+        
+        return best_score, best_move
+    
+    def _search_child(self, board, depth, alpha, beta, deadline):
+        """Score of a child position; shallow subtrees go to negamax_bits
+        
+        Boards wider than 62 bits would overflow the kernel's int64 math
+        under numba, so they stay on the Python search. Without numba the
+        kernel is plain Python that never checks the deadline, so the
+        whole search stays in _negamax.
+        """
+        if HAVE_NUMBA and depth <= KERNEL_DEPTH and board.N <= 62:
+            return negamax_bits(board.s_bits, board.o_bits, board.empty_mask,
+                                depth, alpha, beta, board._shifts)
+        return self._negamax(board, depth, alpha, beta, deadline)[0]
     
-    def _valid_and_equals(self, board, row, col, expected):
-        """Check if position is valid and has expected value"""
-        return (board._is_valid_pos(row, col) and 
-                board.get_cell(row, col) == expected)
+    def _ordered_moves(self, board, first=None):
+        """Candidate (priority, row, col, letter) moves, best first
+        
+        Alpha-beta prunes most when strong moves are searched first:
+        4 = first (the transposition table's best move), 3 = completes an
+        SOS, 2 = takes a cell where the other letter would score (a block),
+        1 = next to the center, 0 = anything else.
+        """
+        center = board.center
+        scored_moves = []
+        # Same 62-bit limit as _search_child
+        masks = scoring_masks if board.N <= 62 else _scoring_masks_py
+        win_s, win_o = masks(board.s_bits, board.o_bits, board.empty_mask, board._shifts)
+        
+        for row, col in board.get_empty_cells():
+            bit = 1 << (row * board.size + col)
+            wins_s = win_s & bit
+            wins_o = win_o & bit
+            near_center = abs(row - center) <= 1 and abs(col - center) <= 1
+            for letter, wins, blocks in (('S', wins_s, wins_o), ('O', wins_o, wins_s)):
+                if (row, col, letter) == first:
+                    priority = 4
+                elif wins:
+                    priority = 3
+                elif blocks:
+                    priority = 2
+                elif near_center:
+                    priority = 1
+                else:
+                    priority = 0
+                scored_moves.append((priority, row, col, letter))
+        
+        # Stable sort keeps row-major order within a priority
+        scored_moves.sort(key=lambda move: move[0], reverse=True)
+        return scored_moves
     
-    def _should_block_here(self, board, row, col):
-        """Quick check if opponent can win here"""
-        return (self._can_win_here(board, row, col, 'S') or 
-                self._can_win_here(board, row, col, 'O'))
+    def _can_win_here(self, board, row, col, letter):
+        """Check if placing letter here creates SOS - NO BOARD COPY"""
+        # Off-board reads land on the border padding, which never matches
+        pos = (row + board.PAD) * board._stride + col + board.PAD
+        flat = board._flat
+        s_code = board.S
+        
+        if letter == 'S':
+            o_code = board.O
+            for step in board._line_steps:
+                # S at start or at end: S-O-S
+                if ((flat[pos + step] == o_code and flat[pos + 2*step] == s_code) or
+                    (flat[pos - step] == o_code and flat[pos - 2*step] == s_code)):
+                    return True
+        elif letter == 'O':
+            for step in board._line_steps:
+                # O in middle: S-O-S
+                if flat[pos - step] == s_code and flat[pos + step] == s_code:
+                    return True
+        return False
     
     def _get_quick_strategic_move(self, board, empty_cells):
         """Get strategic move instantly"""
         if not empty_cells:
             return None
         
-        center = board.size // 2
+        center = board.center
+        last = board.size - 1
+        best_bucket = 5
+        best_cell = None
         
-        # Priority 1: Center (if available)
-        if (center, center) in empty_cells:
-            letter = self._quick_letter_choice(board, center, center)
-            return center, center, letter
-        
-        # Priority 2: Near center (1 cell away)
-        for row, col in empty_cells:
-            if abs(row - center) <= 1 and abs(col - center) <= 1:
-                letter = self._quick_letter_choice(board, row, col)
-                return row, col, letter
-        
-        # Priority 3: Corners
-        corners = [(0, 0), (0, board.size-1), (board.size-1, 0), (board.size-1, board.size-1)]
-        for row, col in corners:
-            if (row, col) in empty_cells:
-                letter = self._quick_letter_choice(board, row, col)
-                return row, col, letter
-        
-        # Priority 4: Edges
+        # One pass, keeping the first cell of the best bucket:
+        # 0 = center, 1 = near center (1 cell away), 2 = corner, 3 = edge, 4 = other
         for row, col in empty_cells:
-            if (row == 0 or row == board.size-1 or 
-                col == 0 or col == board.size-1):
-                letter = self._quick_letter_choice(board, row, col)
-                return row, col, letter
+            if row == center and col == center:
+                bucket = 0
+            elif abs(row - center) <= 1 and abs(col - center) <= 1:
+                bucket = 1
+            elif (row, col) in board.corners:
+                bucket = 2
+            elif row == 0 or row == last or col == 0 or col == last:
+                bucket = 3
+            else:
+                bucket = 4
+            
+            if bucket < best_bucket:
+                best_bucket = bucket
+                best_cell = (row, col)
+                if bucket == 0:
+                    break
         
-        # Priority 5: Any remaining cell
-        row, col = empty_cells[0]
+        row, col = best_cell
         letter = self._quick_letter_choice(board, row, col)
         return row, col, letter
     
@@ -129,16 +374,16 @@ class AIPlayer(Player):
         """Instant letter selection based on neighbors"""
         s_count = 0
         o_count = 0
+        flat = board._flat
+        pos = (row + board.PAD) * board._stride + col + board.PAD
         
-        # Only check 4 main directions for speed
-        for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-            nr, nc = row + dr, col + dc
-            if board._is_valid_pos(nr, nc):
-                cell = board.get_cell(nr, nc)
-                if cell == 'S':
-                    s_count += 1
-                elif cell == 'O':
-                    o_count += 1
+        # Only check the 4 main neighbors for speed
+        for step in board._neighbor_steps:
+            cell = flat[pos + step]
+            if cell == board.S:
+                s_count += 1
+            elif cell == board.O:
+                o_count += 1
         
         # Quick decision
         if s_count > o_count:
@@ -146,7 +391,7 @@ class AIPlayer(Player):
         elif o_count > s_count:
             return 'S'  # Balance with S
         else:
-            return 'S' if random.random() > 0.5 else 'O'  # Random when equal
+            return 'S' if self._rng.getrandbits(1) else 'O'  # Random when equal
     
     def set_difficulty(self, difficulty):
         """Set AI difficulty level"""
@@ -172,15 +417,18 @@ class AIPlayer(Player):
         if not move or move[0] is None:
             return None, "No valid moves available"
         
-        row, col, letter = move
-        explanation = f"AI plays {letter} at position ({row+1},{col+1})"
+        explanation = _EXPLANATIONS.get(move)
+        if explanation is None:
+            row, col, letter = move
+            explanation = _EXPLANATIONS[move] = \
+                f"AI plays {letter} at position ({row+1},{col+1})"
         
         return move, explanation
     
     def analyze_board(self, board):
         """Quick board analysis"""
-        empty_cells = len(board.get_empty_cells())
-        total_cells = board.size * board.size
+        empty_cells = len(board._empty_set)
+        total_cells = board.N
         
         return {
             'empty_cells': empty_cells,
@@ -193,4 +441,4 @@ class AIPlayer(Player):
 # Untuk backward compatibility
 class FastAI(AIPlayer):
     """Alias untuk AIPlayer"""
-    pass
\ No newline at end of file
+    __slots__ = ()
\ No newline at end of file
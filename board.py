@@ -3,116 +3,333 @@ SOS Game Board Logic - Pygame Version
 Mengelola papan permainan dan deteksi SOS untuk pygame
 """
 
+import random
+
+class _Play:
+    """Context manager for SOSBoard.play: make_move on enter, unmake on exit"""
+    __slots__ = ('board', 'row', 'col', 'letter', 'depth')
+    
+    def __init__(self, board, row, col, letter):
+        self.board = board
+        self.row = row
+        self.col = col
+        self.letter = letter
+    
+    def __enter__(self):
+        board = self.board
+        self.depth = len(board._undo_stack)
+        return board.make_move(self.row, self.col, self.letter)
+    
+    def __exit__(self, exc_type, exc, tb):
+        # Invalid moves push nothing, so only undo what was pushed
+        if len(self.board._undo_stack) > self.depth:
+            self.board.unmake_move()
+        return False
+
 class SOSBoard:
+    # Fixed attribute set: boards are created and copied during search
+    __slots__ = ('size', 'N', 'center', 'corners',
+                 's_bits', 'o_bits', 'empty_mask',
+                 'sos_sequences', '_sos_set', '_shifts',
+                 '_triples', '_triple_cells', '_triples_by_cell', '_ids_by_ends',
+                 '_stride', '_line_steps', '_neighbor_steps', '_flat',
+                 'check_sos_formations', '_undo_stack', '_zobrist', '_zobrist_keys',
+                 '_empty_cells', '_empty_set', '_dirty')
+    
+    # Directions: horizontal, vertical, diagonal down-right, diagonal down-left
+    DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+    
+    # Cell codes in _flat; BORDER fills the padding around the board
+    EMPTY = 0
+    S = 1
+    O = 2
+    BORDER = 3
+    # Code -> letter for get_cell, and letter (or code) -> code for make_move
+    _LETTERS = ('', 'S', 'O')
+    _CODES = {'S': S, 'O': O, S: S, O: O}
+    # Cells of padding on each side of _flat, enough for row +- 2*dr
+    PAD = 2
+    
+    # size -> ((step, start_mask), ...) per direction, shared by all boards
+    _shift_tables = {}
+    # size -> empty padded _flat, copied for each new board
+    _flat_templates = {}
+    # size -> (triples, triple_cells, triples_by_cell) for every SOS line
+    _triple_tables = {}
+    # size -> {(start, end) _flat indices: triple id}
+    _triple_ids = {}
+    # size -> per cell index, 64-bit keys indexed by cell code (EMPTY is 0)
+    _zobrist_tables = {}
+    
     def __init__(self, size=5):
         self.size = size
-        self.board = [['' for _ in range(size)] for _ in range(size)]
+        self.N = size * size
+        self.center = size // 2
+        self.corners = ((0, 0), (0, size-1), (size-1, 0), (size-1, size-1))
+        # Bitboards: bit index = row * size + col
+        self.s_bits = 0
+        self.o_bits = 0
+        self.empty_mask = (1 << self.N) - 1
         self.sos_sequences = []  # Menyimpan urutan SOS yang ditemukan
+        self._sos_set = set()    # triple ids of sos_sequences, for O(1) dedup
+        self._shifts = self._get_shift_table(size)
+        self._triples, self._triple_cells, self._triples_by_cell = \
+            self._ensure_triples(size)
+        # One code per cell, framed by BORDER padding so neighbor reads
+        # never need a bounds check: cell (row, col) is at
+        # (row + PAD) * stride + col + PAD
+        self._stride = stride = size + 2*self.PAD
+        self._line_steps = (1, stride, stride + 1, stride - 1)  # as DIRECTIONS
+        self._neighbor_steps = (-stride, stride, -1, 1)
+        self._flat = self._get_flat_template(size)[:]
+        if size == 5:
+            self._ids_by_ends = self._get_triple_ids(size)
+            self.check_sos_formations = self._check_formations_5x5
+        else:
+            self.check_sos_formations = self._check_formations_generic
+        self._undo_stack = []    # (row, col, bit, added triple ids) per placed move
+        # Zobrist hash of the position, XOR-updated by make/unmake
+        self._zobrist_keys = self._get_zobrist_table(size)
+        self._zobrist = 0
+        # Empty cells kept incrementally; the ordered list is rebuilt lazily
+        self._empty_cells = [(i, j) for i in range(size) for j in range(size)]
+        self._empty_set = set(self._empty_cells)
+        self._dirty = False
+    
+    def reset(self):
+        """Clear the board for a new game without reallocating it"""
+        self.s_bits = 0
+        self.o_bits = 0
+        self.empty_mask = (1 << self.N) - 1
+        self.sos_sequences = []
+        self._sos_set = set()
+        self._flat = self._get_flat_template(self.size)[:]
+        self._undo_stack = []
+        self._zobrist = 0
+        self._empty_cells = [(i, j) for i in range(self.size) for j in range(self.size)]
+        self._empty_set = set(self._empty_cells)
+        self._dirty = False
+    
+    @classmethod
+    def _get_shift_table(cls, size):
+        """Get per-direction (step, start_mask) table for a board size
+        
+        start_mask has a bit set for every cell where an S-O-S line in that
+        direction can start without running off the board (or wrapping
+        around a column edge).
+        """
+        table = cls._shift_tables.get(size)
+        if table is None:
+            entries = []
+            for dr, dc in cls.DIRECTIONS:
+                start_mask = 0
+                for row in range(size):
+                    for col in range(size):
+                        if (0 <= row + 2*dr < size and
+                            0 <= col + 2*dc < size):
+                            start_mask |= 1 << (row * size + col)
+                entries.append((dr * size + dc, start_mask))
+            table = cls._shift_tables[size] = tuple(entries)
+        return table
+    
+    @classmethod
+    def _get_flat_template(cls, size):
+        """Get the empty padded byte board for a board size"""
+        template = cls._flat_templates.get(size)
+        if template is None:
+            stride = size + 2*cls.PAD
+            template = bytearray([cls.BORDER]) * (stride * stride)
+            for row in range(size):
+                start = (row + cls.PAD) * stride + cls.PAD
+                template[start:start + size] = bytes([cls.EMPTY]) * size
+            cls._flat_templates[size] = template
+        return template
+    
+    @classmethod
+    def _ensure_triples(cls, size):
+        """Get (triples, triple_cells, triples_by_cell) for a board size
+        
+        triples[tid] is the (start, middle, end) _flat indices of every line
+        of three on the board; triple_cells[tid] is the same line as (row,
+        col) pairs and triples_by_cell[row * size + col] the ids of the
+        lines through that cell.
+        """
+        tables = cls._triple_tables.get(size)
+        if tables is None:
+            stride = size + 2*cls.PAD
+            
+            def padded(i):
+                row, col = divmod(i, size)
+                return (row + cls.PAD) * stride + col + cls.PAD
+            
+            lines = []
+            for step, start_mask in cls._get_shift_table(size):
+                for start in range(size * size):
+                    if (start_mask >> start) & 1:
+                        lines.append((start, start + step, start + 2*step))
+            triples = tuple(tuple(padded(i) for i in line) for line in lines)
+            triple_cells = tuple(tuple(divmod(i, size) for i in line)
+                                 for line in lines)
+            triples_by_cell = tuple(
+                tuple(tid for tid, line in enumerate(lines) if i in line)
+                for i in range(size * size))
+            tables = cls._triple_tables[size] = (triples, triple_cells,
+                                                 triples_by_cell)
+        return tables
+    
+    @classmethod
+    def _get_zobrist_table(cls, size):
+        """Get the Zobrist keys for a board size (same on every run)"""
+        table = cls._zobrist_tables.get(size)
+        if table is None:
+            rng = random.Random(size)
+            table = cls._zobrist_tables[size] = tuple(
+                (0, rng.getrandbits(64), rng.getrandbits(64))
+                for _ in range(size * size))
+        return table
+    
+    @classmethod
+    def _get_triple_ids(cls, size):
+        """Get {(start, end): triple id} over the _flat indices of each line"""
+        ids = cls._triple_ids.get(size)
+        if ids is None:
+            triples = cls._ensure_triples(size)[0]
+            ids = cls._triple_ids[size] = {
+                (start, end): tid for tid, (start, _, end) in enumerate(triples)}
+        return ids
     
     def is_valid_move(self, row, col):
         """Check if move is valid"""
-        return (0 <= row < self.size and 
-                0 <= col < self.size and 
-                self.board[row][col] == '')
+        return (0 <= row < self.size and
+                0 <= col < self.size and
+                (self.empty_mask >> (row * self.size + col)) & 1 == 1)
     
     def make_move(self, row, col, letter):
-        """Make a move and return points scored"""
-        if not self.is_valid_move(row, col):
+        """Make a move and return points scored
+        
+        letter may be 'S' / 'O' or the SOSBoard.S / SOSBoard.O code.
+        """
+        code = self._CODES.get(letter)
+        if code is None or not self.is_valid_move(row, col):
             return 0
         
-        self.board[row][col] = letter
-        points = self.check_sos_formations(row, col)
+        index = row * self.size + col
+        bit = 1 << index
+        self._zobrist ^= self._zobrist_keys[index][code]
+        if code == self.S:
+            self.s_bits |= bit
+        else:
+            self.o_bits |= bit
+        self._flat[(row + self.PAD) * self._stride + col + self.PAD] = code
+        self.empty_mask &= ~bit
+        self._empty_set.discard((row, col))
+        self._dirty = True
+        
+        added_ids = []
+        points = self.check_sos_formations(row, col, added_ids)
+        self._undo_stack.append((row, col, bit, added_ids))
         return points
     
-    def check_sos_formations(self, row, col):
-        """Check for SOS formations after placing a letter"""
-        points = 0
-        letter = self.board[row][col]
+    def unmake_move(self):
+        """Undo the last placed move in O(1), return the points it scored"""
+        if not self._undo_stack:
+            return 0
         
-        # Directions: horizontal, vertical, diagonal
-        directions = [
-            (0, 1),   # horizontal
-            (1, 0),   # vertical
-            (1, 1),   # diagonal down-right
-            (1, -1)   # diagonal down-left
-        ]
+        row, col, bit, added_ids = self._undo_stack.pop()
+        self._zobrist ^= self._zobrist_keys[row * self.size + col][
+            self.S if self.s_bits & bit else self.O]
+        self.s_bits &= ~bit
+        self.o_bits &= ~bit
+        self.empty_mask |= bit
+        self._flat[(row + self.PAD) * self._stride + col + self.PAD] = self.EMPTY
+        self._empty_set.add((row, col))
+        self._dirty = True
         
-        for dr, dc in directions:
-            # Check if current position is middle of SOS
-            if letter == 'O':
-                points += self._check_sos_middle(row, col, dr, dc)
-            
-            # Check if current position is start of SOS
-            if letter == 'S':
-                points += self._check_sos_start(row, col, dr, dc)
-            
-            # Check if current position is end of SOS
-            if letter == 'S':
-                points += self._check_sos_end(row, col, dr, dc)
+        # New SOS are always appended, so they sit at the tail
+        for tid in added_ids:
+            self._sos_set.discard(tid)
+            self.sos_sequences.pop()
+        return len(added_ids)
+    
+    def play(self, row, col, letter):
+        """Context manager that plays a move and undoes it on exit
         
-        return points
+            with board.play(row, col, 'S') as points:
+                ...
+        """
+        return _Play(self, row, col, letter)
     
-    def _check_sos_middle(self, row, col, dr, dc):
-        """Check if O is middle of SOS in given direction"""
-        points = 0
+    def _check_formations_generic(self, row, col, added_ids=None):
+        """Check for SOS formations after placing a letter
         
-        # Check S-O-S pattern
-        prev_row, prev_col = row - dr, col - dc
-        next_row, next_col = row + dr, col + dc
+        Triple ids of newly recorded sequences are appended to added_ids,
+        if given.
+        """
+        points = 0
+        flat = self._flat
+        s_code = self.S
+        o_code = self.O
+        triples = self._triples
         
-        if (self._is_valid_pos(prev_row, prev_col) and 
-            self._is_valid_pos(next_row, next_col) and
-            self.board[prev_row][prev_col] == 'S' and 
-            self.board[next_row][next_col] == 'S'):
-            
-            # Add SOS sequence
-            sos_seq = [(prev_row, prev_col), (row, col), (next_row, next_col)]
-            if sos_seq not in self.sos_sequences:
-                self.sos_sequences.append(sos_seq)
+        # Only the (at most 12) lines through this cell can be new
+        for tid in self._triples_by_cell[row * self.size + col]:
+            start, middle, end = triples[tid]
+            if (flat[start] == s_code and flat[middle] == o_code and
+                flat[end] == s_code and tid not in self._sos_set):
+                self._sos_set.add(tid)
+                self.sos_sequences.append(list(self._triple_cells[tid]))
+                if added_ids is not None:
+                    added_ids.append(tid)
                 points += 1
         
         return points
     
-    def _check_sos_start(self, row, col, dr, dc):
-        """Check if S is start of SOS in given direction"""
-        points = 0
+    def _check_formations_5x5(self, row, col, added_ids=None):
+        """check_sos_formations unrolled for size 5 (_flat stride 9)
         
-        # Check S-O-S pattern starting from current S
-        mid_row, mid_col = row + dr, col + dc
-        end_row, end_col = row + 2*dr, col + 2*dc
+        Offsets 1, 9, 10 and 8 step along DIRECTIONS; the BORDER padding
+        keeps every read in range. Same contract as the generic check.
+        """
+        pos = (row + 2) * 9 + col + 2
+        flat = self._flat
+        found = []
         
-        if (self._is_valid_pos(mid_row, mid_col) and 
-            self._is_valid_pos(end_row, end_col) and
-            self.board[mid_row][mid_col] == 'O' and 
-            self.board[end_row][end_col] == 'S'):
-            
-            # Add SOS sequence
-            sos_seq = [(row, col), (mid_row, mid_col), (end_row, end_col)]
-            if sos_seq not in self.sos_sequences:
-                self.sos_sequences.append(sos_seq)
-                points += 1
+        if flat[pos] == 1:  # S: this cell starts or ends a line
+            if flat[pos + 1] == 2 and flat[pos + 2] == 1:
+                found.append((pos, pos + 2))
+            if flat[pos - 1] == 2 and flat[pos - 2] == 1:
+                found.append((pos - 2, pos))
+            if flat[pos + 9] == 2 and flat[pos + 18] == 1:
+                found.append((pos, pos + 18))
+            if flat[pos - 9] == 2 and flat[pos - 18] == 1:
+                found.append((pos - 18, pos))
+            if flat[pos + 10] == 2 and flat[pos + 20] == 1:
+                found.append((pos, pos + 20))
+            if flat[pos - 10] == 2 and flat[pos - 20] == 1:
+                found.append((pos - 20, pos))
+            if flat[pos + 8] == 2 and flat[pos + 16] == 1:
+                found.append((pos, pos + 16))
+            if flat[pos - 8] == 2 and flat[pos - 16] == 1:
+                found.append((pos - 16, pos))
+        elif flat[pos] == 2:  # O: this cell is the middle of a line
+            if flat[pos - 1] == 1 and flat[pos + 1] == 1:
+                found.append((pos - 1, pos + 1))
+            if flat[pos - 9] == 1 and flat[pos + 9] == 1:
+                found.append((pos - 9, pos + 9))
+            if flat[pos - 10] == 1 and flat[pos + 10] == 1:
+                found.append((pos - 10, pos + 10))
+            if flat[pos - 8] == 1 and flat[pos + 8] == 1:
+                found.append((pos - 8, pos + 8))
         
-        return points
-    
-    def _check_sos_end(self, row, col, dr, dc):
-        """Check if S is end of SOS in given direction"""
         points = 0
-        
-        # Check S-O-S pattern ending at current S
-        mid_row, mid_col = row - dr, col - dc
-        start_row, start_col = row - 2*dr, col - 2*dc
-        
-        if (self._is_valid_pos(mid_row, mid_col) and 
-            self._is_valid_pos(start_row, start_col) and
-            self.board[mid_row][mid_col] == 'O' and 
-            self.board[start_row][start_col] == 'S'):
-            
-            # Add SOS sequence
-            sos_seq = [(start_row, start_col), (mid_row, mid_col), (row, col)]
-            if sos_seq not in self.sos_sequences:
-                self.sos_sequences.append(sos_seq)
+        for ends in found:
+            tid = self._ids_by_ends[ends]
+            if tid not in self._sos_set:
+                self._sos_set.add(tid)
+                self.sos_sequences.append(list(self._triple_cells[tid]))
+                if added_ids is not None:
+                    added_ids.append(tid)
                 points += 1
-        
         return points
     
     def _is_valid_pos(self, row, col):
@@ -122,33 +339,68 @@ class SOSBoard:
     def get_cell(self, row, col):
         """Get cell value"""
         if self._is_valid_pos(row, col):
-            return self.board[row][col]
+            return self._LETTERS[self._flat[(row + self.PAD) * self._stride + col + self.PAD]]
         return None
     
+    def get_cell_int(self, row, col):
+        """Get cell code (EMPTY, S or O); off-board cells read as BORDER"""
+        if self._is_valid_pos(row, col):
+            return self._flat[(row + self.PAD) * self._stride + col + self.PAD]
+        return self.BORDER
+    
+    @property
+    def board(self):
+        """Board as a list of rows ('' for empty), for legacy callers"""
+        return [[self.get_cell(row, col) for col in range(self.size)]
+                for row in range(self.size)]
+    
     def is_full(self):
         """Check if board is full"""
-        for row in self.board:
-            for cell in row:
-                if cell == '':
-                    return False
-        return True
+        return not self._empty_set
     
     def get_empty_cells(self):
-        """Get list of empty cells"""
-        empty_cells = []
-        for i in range(self.size):
-            for j in range(self.size):
-                if self.board[i][j] == '':
-                    empty_cells.append((i, j))
-        return empty_cells
+        """Get list of empty cells (cached, row-major; do not mutate)"""
+        if self._dirty:
+            empty_cells = []
+            mask = self.empty_mask
+            while mask:
+                low = mask & -mask
+                mask ^= low
+                empty_cells.append(divmod(low.bit_length() - 1, self.size))
+            self._empty_cells = empty_cells
+            self._dirty = False
+        return self._empty_cells
     
     def copy(self):
         """Create a copy of the board"""
         new_board = SOSBoard(self.size)
-        new_board.board = [row[:] for row in self.board]
+        new_board.s_bits = self.s_bits
+        new_board.o_bits = self.o_bits
+        new_board.empty_mask = self.empty_mask
+        new_board._flat = self._flat[:]
         new_board.sos_sequences = [seq[:] for seq in self.sos_sequences]
+        new_board._sos_set = set(self._sos_set)
+        new_board._undo_stack = self._undo_stack[:]
+        new_board._zobrist = self._zobrist
+        new_board._empty_cells = self._empty_cells
+        new_board._empty_set = set(self._empty_set)
+        new_board._dirty = self._dirty
         return new_board
     
+    def __eq__(self, other):
+        """Boards are equal when they hold the same letters"""
+        if not isinstance(other, SOSBoard):
+            return NotImplemented
+        return (self.size == other.size and self.s_bits == other.s_bits and
+                self.o_bits == other.o_bits)
+    
+    def __hash__(self):
+        """Zobrist hash of the current position
+        
+        The board is mutable: do not change a board while it is a dict key.
+        """
+        return self._zobrist
+    
     def display(self):
         """Display board for debugging"""
         print("\n  " + " ".join([str(i) for i in range(self.size)]))
@@ -162,4 +414,4 @@ class SOSBoard:
         for row in self.board:
             for cell in row:
                 state += cell if cell else "."
-        return state
\ No newline at end of file
+        return state
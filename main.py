@@ -4,6 +4,9 @@ Enhanced SOS Game - Pygame Version
 - AI plays as 'O', Human plays as 'S'
 - Added: Difficulty levels, Game statistics, Sound effects, Hints system
 - Added: Undo/Redo, Game history, Better AI, Animation improvements
+
+Requires pygame and numpy; numba and orjson are used when installed
+(see requirements.txt).
 """
 
 import pygame
@@ -13,10 +16,36 @@ import random
 import json
 import os
 from enum import Enum
-from dataclasses import dataclass
+import atexit
+from dataclasses import dataclass, asdict
 from typing import List, Tuple, Optional
+from concurrent.futures import ThreadPoolExecutor
 import math 
 
+import numpy as np
+
+# orjson, when installed, writes the stats file faster than json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# numba is optional (it compiles the hard AI's inner search); importing
+# it takes ~0.4s, so SOS_NO_NUMBA=1 skips it. The kernels are not
+# disk-cached: the cache is tied to the module name, and this file runs
+# both as __main__ and as an imported module.
+try:
+    if os.environ.get("SOS_NO_NUMBA"):
+        raise ImportError("numba disabled by SOS_NO_NUMBA")
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+    
+    def njit(*args, **kwargs):
+        """Fallback when numba is missing: run the plain Python function"""
+        return lambda func: func
+
 # Initialize Pygame
 pygame.init()
 pygame.mixer.init()
@@ -28,6 +57,115 @@ BOARD_SIZE = 5
 CELL_SIZE = 100
 BOARD_OFFSET_X = 150
 BOARD_OFFSET_Y = 200
+# Score particles: live particle cap and lifetime in frames
+MAX_PARTICLES = 4096
+PARTICLE_LIFE = 80
+# Per-frame fall acceleration and radius decay (float32, like the particle arrays)
+PARTICLE_GRAVITY = np.float32(0.15)
+PARTICLE_SHRINK = np.float32(0.05)
+# Longest the idle main loop sleeps waiting for an event
+IDLE_WAIT_MS = 100
+# Rendered text surfaces kept before the cache is cleared
+TEXT_CACHE_SIZE = 512
+# Distinct font sizes the pulsing winner text steps through
+WINNER_FONT_STEPS = 10
+
+# All eight neighbor directions, as (row step, col step)
+DIRECTIONS = ((-1, -1), (-1, 0), (-1, 1),
+              (0, -1),           (0, 1),
+              (1, -1),  (1, 0),  (1, 1))
+
+# AI transposition table: bound flags and size cap
+TT_EXACT, TT_LOWER, TT_UPPER = 0, 1, 2
+TT_MAX_ENTRIES = 1 << 20
+# Hard AI: iterative deepening depth cap (plies) and time budget (seconds)
+HARD_SEARCH_DEPTH = 5
+HARD_SEARCH_BUDGET = 0.25
+# Remaining depth at which the search hands off to negamax_kernel (numba only)
+KERNEL_DEPTH = 3
+SCORE_INF = 1 << 20
+
+@njit(nogil=True)
+def winning_mask(s_bits, o_bits, empty_mask, shifts, place_o):
+    """Mask of empty cells where placing O (or S) completes an SOS
+    
+    shifts is SOSBoard._shifts: (step, start_mask) per direction.
+    """
+    wins = 0
+    for step, start_mask in shifts:
+        if place_o:
+            # O in middle: S _ S
+            wins |= (s_bits & (empty_mask >> step) & (s_bits >> (2 * step)) & start_mask) << step
+        else:
+            # S at start: _ O S
+            wins |= empty_mask & (o_bits >> step) & (s_bits >> (2 * step)) & start_mask
+            # S at end: S O _
+            wins |= (s_bits & (o_bits >> step) & (empty_mask >> (2 * step)) & start_mask) << (2 * step)
+    return wins
+
+@njit(nogil=True)
+def count_sos_points(s_bits, o_bits, bit, shifts):
+    """Points for the S-O-S lines through the (already placed) cell at bit
+    
+    Each line scores 2, as in SOSBoard.make_move. ai.count_sos_bits
+    counts lines instead (1 each), matching that AI's own scoring.
+    """
+    count = 0
+    for step, start_mask in shifts:
+        hits = s_bits & (o_bits >> step) & (s_bits >> (2 * step)) & start_mask
+        hits &= bit | (bit >> step) | (bit >> (2 * step))
+        while hits:
+            hits &= hits - 1
+            count += 2
+    return count
+
+@njit(nogil=True)
+def negamax_kernel(s_bits, o_bits, empty_mask, depth, alpha, beta, color, shifts):
+    """Bitboard alpha-beta with EnhancedAI._negamax's rules and scores
+    
+    color 1 places 'O' (the AI), -1 places 'S'. Scoring moves are
+    searched first; they keep the turn, quiet moves pass it.
+    """
+    if depth == 0 or empty_mask == 0:
+        return 0
+    
+    place_o = color > 0
+    wins = winning_mask(s_bits, o_bits, empty_mask, shifts, place_o)
+    best = -SCORE_INF
+    
+    for scoring in (True, False):
+        mask = wins if scoring else empty_mask & ~wins
+        while mask:
+            bit = mask & -mask
+            mask ^= bit
+            if place_o:
+                new_s, new_o = s_bits, o_bits | bit
+            else:
+                new_s, new_o = s_bits | bit, o_bits
+            if scoring:
+                points = count_sos_points(new_s, new_o, bit, shifts)
+                score = points + negamax_kernel(new_s, new_o, empty_mask ^ bit, depth - 1,
+                                                alpha - points, beta - points, color, shifts)
+            else:
+                score = -negamax_kernel(new_s, new_o, empty_mask ^ bit, depth - 1,
+                                        -beta, -alpha, -color, shifts)
+            if score > best:
+                best = score
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                return best
+    
+    return best
+
+def warm_up_kernels():
+    """Compile negamax_kernel and its helpers by running it on an empty board
+    
+    Takes ~0.75s the first time in a process; EnhancedSOSGame runs it on
+    the AI worker so the UI never waits on it.
+    """
+    board = SOSBoard()
+    negamax_kernel(0, 0, board.empty_mask, 1, -SCORE_INF, SCORE_INF, 1, board._shifts)
 
 class Difficulty(Enum):
     EASY = "Easy"
@@ -59,6 +197,11 @@ COLORS = {
     'hint_highlight': (155, 89, 182)
 }
 
+# Hovered button colors: each button base color lightened by 30
+LIGHTENED = {base: tuple(min(255, c + 30) for c in base)
+             for base in (COLORS['button'], COLORS['accent_orange'], COLORS['accent_green'],
+                          COLORS['accent_blue'], COLORS['accent_red'])}
+
 @dataclass
 class GameStats:
     games_played: int = 0
@@ -75,30 +218,135 @@ class Move:
     letter: str
     player: str
     sos_formed: int
+    sos_ids: Tuple[int, ...] = ()  # triple ids this move completed, for undo
 
 class SOSBoard:
     """Enhanced board with undo/redo functionality"""
     
+    # size -> (triples_by_cell, triple_cells), shared by all boards
+    _triple_tables = {}
+    # size -> ((step, start_mask), ...) per line direction, for the numba kernels
+    _shift_tables = {}
+    # size -> (s_masks, o_masks, cell_bits) uint64 arrays
+    _triple_arrays = {}
+    # size -> ((s_key, o_key) per cell index), seeded so runs are repeatable
+    _zobrist_tables = {}
+    # XORed into a hash by the AI when the opponent ('S') is to move
+    ZOBRIST_SIDE = random.Random(0).getrandbits(64)
+    
     def __init__(self, size=5):
         self.size = size
-        self.board = [[None for _ in range(size)] for _ in range(size)]
+        # Bitboards: bit index = row * size + col
+        self.s_bits = 0
+        self.o_bits = 0
+        self.full_mask = (1 << (size * size)) - 1
+        self.empty_mask = self.full_mask
+        # Row-major empty cells, rebuilt from empty_mask only after a change
+        self._empty_cells = None
         self.sos_sequences = []
+        self.completed_mask = 0  # bit per triple id in sos_sequences
         self.move_history = []
+        self._triples_by_cell, self._triple_cells = self._get_triples(size)
+        self._shifts = self._get_shifts(size)
+        # Zobrist hash of the letters on the board, kept by make / undo
+        self._zobrist_keys = self._get_zobrist_keys(size)
+        self.zobrist = 0
+    
+    @classmethod
+    def _get_shifts(cls, size):
+        """Get per-direction (step, start_mask) for a board size
+        
+        start_mask has a bit for every cell where a line of three in that
+        direction starts without leaving the board.
+        """
+        shifts = cls._shift_tables.get(size)
+        if shifts is None:
+            entries = []
+            for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                start_mask = 0
+                for row in range(size):
+                    for col in range(size):
+                        if 0 <= row + 2*dr < size and 0 <= col + 2*dc < size:
+                            start_mask |= 1 << (row * size + col)
+                entries.append((dr * size + dc, start_mask))
+            shifts = cls._shift_tables[size] = tuple(entries)
+        return shifts
+    
+    @classmethod
+    def _get_zobrist_keys(cls, size):
+        """Get the per-cell (S key, O key) Zobrist table for a board size"""
+        keys = cls._zobrist_tables.get(size)
+        if keys is None:
+            rng = random.Random(size)
+            keys = cls._zobrist_tables[size] = tuple(
+                (rng.getrandbits(64), rng.getrandbits(64))
+                for _ in range(size * size))
+        return keys
+    
+    @classmethod
+    def _get_triples(cls, size):
+        """Get (triples_by_cell, triple_cells) for a board size
+        
+        triples_by_cell[row * size + col] lists (s_mask, o_mask, tid) for
+        every line of three through that cell; triple_cells[tid] is the
+        line as (row, col) pairs.
+        """
+        tables = cls._triple_tables.get(size)
+        if tables is None:
+            triples_by_cell = [[] for _ in range(size * size)]
+            triple_cells = []
+            for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                for row in range(size):
+                    for col in range(size):
+                        end_row, end_col = row + 2*dr, col + 2*dc
+                        if not (0 <= end_row < size and 0 <= end_col < size):
+                            continue
+                        cells = ((row, col), (row + dr, col + dc), (end_row, end_col))
+                        start, middle, end = (r * size + c for r, c in cells)
+                        s_mask = (1 << start) | (1 << end)
+                        o_mask = 1 << middle
+                        tid = len(triple_cells)
+                        triple_cells.append(cells)
+                        for index in (start, middle, end):
+                            triples_by_cell[index].append((s_mask, o_mask, tid))
+            tables = cls._triple_tables[size] = (
+                tuple(tuple(triples) for triples in triples_by_cell),
+                tuple(triple_cells))
+        return tables
+    
+    @property
+    def board(self):
+        """Board as a list of rows (None for empty), for reading only"""
+        return [[self.get_cell(row, col) for col in range(self.size)]
+                for row in range(self.size)]
     
     def is_valid_move(self, row, col):
         return (0 <= row < self.size and 
                 0 <= col < self.size and 
-                self.board[row][col] is None)
+                (self.empty_mask >> (row * self.size + col)) & 1)
     
     def make_move(self, row, col, letter, player_name=""):
-        if not self.is_valid_move(row, col):
+        # is_valid_move, inlined: this runs at every AI search node
+        size = self.size
+        index = row * size + col
+        if not (0 <= row < size and 0 <= col < size and (self.empty_mask >> index) & 1):
             return 0
         
-        self.board[row][col] = letter
-        sos_count = self._check_sos_sequences(row, col)
+        bit = 1 << index
+        self.empty_mask &= ~bit
+        self._empty_cells = None
+        if letter == 'S':
+            self.s_bits |= bit
+            self.zobrist ^= self._zobrist_keys[index][0]
+        else:
+            self.o_bits |= bit
+            self.zobrist ^= self._zobrist_keys[index][1]
+        
+        sos_ids = []
+        sos_count = self._check_sos_sequences(row, col, sos_ids)
         
         # Record move in history
-        move = Move(row, col, letter, player_name, sos_count)
+        move = Move(row, col, letter, player_name, sos_count, tuple(sos_ids))
         self.move_history.append(move)
         
         return sos_count
@@ -109,106 +357,144 @@ class SOSBoard:
             return None
         
         last_move = self.move_history.pop()
-        self.board[last_move.row][last_move.col] = None
-        
-        # Recalculate SOS sequences
-        self.sos_sequences = []
-        temp_history = self.move_history.copy()
-        self.move_history = []
-        
-        for move in temp_history:
-            self.board[move.row][move.col] = move.letter
-            self._check_sos_sequences(move.row, move.col)
-            self.move_history.append(move)
+        index = last_move.row * self.size + last_move.col
+        self.zobrist ^= self._zobrist_keys[index][last_move.letter != 'S']
+        bit = 1 << index
+        self.s_bits &= ~bit
+        self.o_bits &= ~bit
+        self.empty_mask |= bit
+        self._empty_cells = None
+        
+        # New SOS are always appended, so they sit at the tail (two entries each)
+        for tid in last_move.sos_ids:
+            self.completed_mask &= ~(1 << tid)
+            self.sos_sequences.pop()
+            self.sos_sequences.pop()
         
         return last_move
     
-    def _check_sos_sequences(self, row, col):
-        directions = [
-            (-1, -1), (-1, 0), (-1, 1),
-            (0, -1),           (0, 1),
-            (1, -1),  (1, 0),  (1, 1)
-        ]
-        
-        new_sequences = []
-        
-        for dr, dc in directions:
-            # Check SOS with current position as first 'S'
-            if self.board[row][col] == 'S':
-                r1, c1 = row + dr, col + dc
-                r2, c2 = row + 2*dr, col + 2*dc
-                if (self._is_valid_pos(r1, c1) and self._is_valid_pos(r2, c2) and
-                    self.board[r1][c1] == 'O' and self.board[r2][c2] == 'S'):
-                    sequence = [(row, col), (r1, c1), (r2, c2)]
-                    if sequence not in self.sos_sequences:
-                        self.sos_sequences.append(sequence)
-                        new_sequences.append(sequence)
-            
-            # Check SOS with current position as middle 'O'
-            if self.board[row][col] == 'O':
-                r1, c1 = row - dr, col - dc
-                r2, c2 = row + dr, col + dc
-                if (self._is_valid_pos(r1, c1) and self._is_valid_pos(r2, c2) and
-                    self.board[r1][c1] == 'S' and self.board[r2][c2] == 'S'):
-                    sequence = [(r1, c1), (row, col), (r2, c2)]
-                    if sequence not in self.sos_sequences:
-                        self.sos_sequences.append(sequence)
-                        new_sequences.append(sequence)
-            
-            # Check SOS with current position as last 'S'
-            if self.board[row][col] == 'S':
-                r1, c1 = row - dr, col - dc
-                r2, c2 = row - 2*dr, col - 2*dc
-                if (self._is_valid_pos(r1, c1) and self._is_valid_pos(r2, c2) and
-                    self.board[r1][c1] == 'O' and self.board[r2][c2] == 'S'):
-                    sequence = [(r2, c2), (r1, c1), (row, col)]
-                    if sequence not in self.sos_sequences:
-                        self.sos_sequences.append(sequence)
-                        new_sequences.append(sequence)
-        
-        return len(new_sequences)
+    def _check_sos_sequences(self, row, col, added_ids=None):
+        """Record the SOS lines completed through (row, col), return the points
+        
+        Only lines through the placed cell can be new; completed_mask has
+        a bit per triple id. As in the original rules, every SOS is
+        recorded in both directions and scores 2 points. Ids of the new
+        lines are appended to added_ids, if given.
+        """
+        new_count = 0
+        s_bits = self.s_bits
+        o_bits = self.o_bits
+        
+        for s_mask, o_mask, tid in self._triples_by_cell[row * self.size + col]:
+            if ((s_bits & s_mask) == s_mask and (o_bits & o_mask) == o_mask and
+                not (self.completed_mask >> tid) & 1):
+                self.completed_mask |= 1 << tid
+                first, middle, last = self._triple_cells[tid]
+                self.sos_sequences.append([first, middle, last])
+                self.sos_sequences.append([last, middle, first])
+                if added_ids is not None:
+                    added_ids.append(tid)
+                new_count += 2
+        
+        return new_count
     
     def _is_valid_pos(self, row, col):
         return 0 <= row < self.size and 0 <= col < self.size
     
     def get_cell(self, row, col):
         if self._is_valid_pos(row, col):
-            return self.board[row][col]
+            bit = 1 << (row * self.size + col)
+            if self.s_bits & bit:
+                return 'S'
+            if self.o_bits & bit:
+                return 'O'
         return None
     
     def is_full(self):
-        for row in self.board:
-            for cell in row:
-                if cell is None:
-                    return False
-        return True
+        return not self.empty_mask
+    
+    def iter_empty_cells(self):
+        """Yield empty (row, col) cells in row-major order"""
+        empty = self.empty_mask
+        while empty:
+            low = empty & -empty
+            empty ^= low
+            yield divmod(low.bit_length() - 1, self.size)
     
     def get_empty_cells(self):
-        empty_cells = []
-        for row in range(self.size):
-            for col in range(self.size):
-                if self.board[row][col] is None:
-                    empty_cells.append((row, col))
-        return empty_cells
+        """Get list of empty cells (cached until the next move; do not mutate)"""
+        if self._empty_cells is None:
+            self._empty_cells = list(self.iter_empty_cells())
+        return self._empty_cells
     
     def get_possible_sos_moves(self):
         """Get moves that would form SOS sequences"""
         possible_moves = []
-        empty_cells = self.get_empty_cells()
+        empty_cells, s_counts, o_counts = self.get_sos_counts()
         
-        for row, col in empty_cells:
-            for letter in ['S', 'O']: # Ini untuk testing, bukan untuk AI benar-benar menempatkan
-                test_board = self.copy()
-                sos_count = test_board.make_move(row, col, letter)
-                if sos_count > 0:
-                    possible_moves.append((row, col, letter, sos_count))
+        for (row, col), s_count, o_count in zip(empty_cells, s_counts, o_counts):
+            if s_count > 0:
+                possible_moves.append((row, col, 'S', s_count))
+            if o_count > 0:
+                possible_moves.append((row, col, 'O', o_count))
         
         return possible_moves
     
+    def get_sos_counts(self):
+        """Get (empty cells, SOS each completes with 'S', ... with 'O')
+        
+        Every (cell, triple) pair is tested in one numpy batch: a triple
+        is new if it is full once the cell's bit is added but was not
+        full before. Boards too big for uint64 masks use make/undo.
+        """
+        empty_cells = self.get_empty_cells()
+        if not empty_cells:
+            return empty_cells, [], []
+        
+        if self.size * self.size > 64:
+            s_counts = []
+            o_counts = []
+            for row, col in empty_cells:
+                s_counts.append(self.make_move(row, col, 'S'))
+                self.undo_last_move()
+                o_counts.append(self.make_move(row, col, 'O'))
+                self.undo_last_move()
+            return empty_cells, s_counts, o_counts
+        
+        arrays = self._triple_arrays.get(self.size)
+        if arrays is None:
+            s_masks = np.zeros(len(self._triple_cells), dtype=np.uint64)
+            o_masks = np.zeros(len(self._triple_cells), dtype=np.uint64)
+            for cell_triples in self._triples_by_cell:
+                for s_mask, o_mask, tid in cell_triples:
+                    s_masks[tid] = s_mask
+                    o_masks[tid] = o_mask
+            cell_bits = (np.uint64(1) << np.arange(self.size * self.size,
+                                                   dtype=np.uint64))[:, None]
+            arrays = self._triple_arrays[self.size] = (s_masks, o_masks, cell_bits)
+        s_masks, o_masks, cell_bits = arrays
+        
+        s_bits = np.uint64(self.s_bits)
+        o_bits = np.uint64(self.o_bits)
+        bits = cell_bits[[row * self.size + col for row, col in empty_cells]]
+        s_full = (s_bits & s_masks) == s_masks
+        o_full = (o_bits & o_masks) == o_masks
+        not_before = ~(s_full & o_full)
+        s_new = (((s_bits | bits) & s_masks) == s_masks) & o_full & not_before
+        o_new = s_full & (((o_bits | bits) & o_masks) == o_masks) & not_before
+        # 2 points per SOS, as make_move scores them
+        return (empty_cells, (2 * np.count_nonzero(s_new, axis=1)).tolist(),
+                (2 * np.count_nonzero(o_new, axis=1)).tolist())
+    
     def copy(self):
         new_board = SOSBoard(self.size)
-        new_board.board = [row[:] for row in self.board]
+        new_board.s_bits = self.s_bits
+        new_board.o_bits = self.o_bits
+        new_board.empty_mask = self.empty_mask
+        new_board._empty_cells = self._empty_cells
+        new_board.zobrist = self.zobrist
         new_board.sos_sequences = [seq[:] for seq in self.sos_sequences]
+        new_board.completed_mask = self.completed_mask
         new_board.move_history = self.move_history.copy()
         return new_board
 
@@ -225,15 +511,25 @@ class Player:
     def reset_score(self):
         self.score = 0
 
+class _SearchTimeout(Exception):
+    """Raised inside the hard AI search once its time budget is spent"""
+
 class EnhancedAI:
     """Enhanced AI with multiple difficulty levels"""
     
+    # size -> ((row, col, bit), ...) sorted by distance from the center
+    _center_orders = {}
+    # size -> per cell index, (bit before, bit after) for each on-board DIRECTIONS pair
+    _neighbor_pairs = {}
+    
     def __init__(self, difficulty: Difficulty):
         self.difficulty = difficulty
         self.name = f"AI ({difficulty.value})"
         self.letter = 'O'  # AI always plays 'O'
         self.score = 0
         self.is_ai = True
+        # Position hash -> (depth, flag, score, best_move)
+        self._tt = {}
     
     def add_points(self, points):
         self.score += points
@@ -318,14 +614,12 @@ class EnhancedAI:
     
     def _find_sos_move(self, board):
         """Find move that creates SOS"""
-        empty_cells = board.get_empty_cells()
+        # AI hanya mencoba menempatkan 'O' untuk membentuk SOS
+        empty_cells, _, counts = board.get_sos_counts()
         best_move = None
         max_sos = 0
         
-        for row, col in empty_cells:
-            # AI hanya mencoba menempatkan 'O' untuk membentuk SOS
-            test_board = board.copy()
-            sos_count = test_board.make_move(row, col, self.letter) # Hanya coba 'O'
+        for (row, col), sos_count in zip(empty_cells, counts):
             if sos_count > max_sos:
                 max_sos = sos_count
                 best_move = (row, col, self.letter) # Pastikan mengembalikan 'O'
@@ -336,10 +630,11 @@ class EnhancedAI:
         """Find move that blocks opponent from forming SOS"""
         empty_cells = board.get_empty_cells()
         
+        # Stops at the first block, so a batched get_sos_counts would not pay off
         for row, col in empty_cells:
             # Coba simulasi lawan menempatkan 'S'
-            test_board_opponent = board.copy()
-            opponent_sos_count = test_board_opponent.make_move(row, col, 'S') # Lawan selalu 'S'
+            opponent_sos_count = board.make_move(row, col, 'S') # Lawan selalu 'S'
+            board.undo_last_move()
             if opponent_sos_count > 0:
                 # Jika lawan bisa membuat SOS, blokir dengan 'O'
                 return row, col, self.letter # AI selalu memblokir dengan 'O'
@@ -362,10 +657,7 @@ class EnhancedAI:
             score += (board.size - distance_from_center) * 2
             
             # Hanya perhitungkan potensi SOS jika AI menempatkan 'O'
-            test_board = board.copy()
-            test_board.board[row][col] = self.letter # Hanya simulasi 'O'
-            
-            potential_sos = self._count_potential_sos(test_board, row, col)
+            potential_sos = self._count_potential_sos(board, row, col, self.letter)
             score += potential_sos * 5
             
             scored_moves.append((score, row, col))
@@ -377,60 +669,161 @@ class EnhancedAI:
         
         return None
     
-    def _count_potential_sos(self, board, row, col):
-        """Count how many potential SOS sequences this position could complete"""
-        directions = [
-            (-1, -1), (-1, 0), (-1, 1),
-            (0, -1),           (0, 1),
-            (1, -1),  (1, 0),  (1, 1)
-        ]
+    def _count_potential_sos(self, board, row, col, letter=None):
+        """Count how many potential SOS sequences this position could complete
+        
+        letter is what the cell holds (or would hold); by default the
+        letter already on the board.
+        """
+        pairs = self._neighbor_pairs.get(board.size)
+        if pairs is None:
+            size = board.size
+            pairs = self._neighbor_pairs[size] = tuple(
+                tuple((1 << ((r - dr) * size + c - dc), 1 << ((r + dr) * size + c + dc))
+                      for dr, dc in DIRECTIONS
+                      if board._is_valid_pos(r - dr, c - dc) and
+                      board._is_valid_pos(r + dr, c + dc))
+                for r in range(size) for c in range(size))
+        
+        if letter is None:
+            letter = board.get_cell(row, col)
+        
+        # Tambahkan logika untuk S-O-? jika AI bisa menempatkan S, tapi di sini AI hanya 'O'
+        # Jadi, kita hanya fokus pada O sebagai huruf tengah.
+        if letter != 'O':
+            return 0
         
         potential_count = 0
-        current_letter = board.board[row][col]
-        
-        # Perhatikan bahwa current_letter di sini sudah diasumsikan 'O' karena Strategic AI hanya mencoba 'O'
-        
-        for dr, dc in directions:
-            if current_letter == 'O':
-                r1, c1 = row - dr, col - dc
-                r2, c2 = row + dr, col + dc
-                if (board._is_valid_pos(r1, c1) and board._is_valid_pos(r2, c2)):
-                    if ((board.board[r1][c1] == 'S' and board.board[r2][c2] is None) or
-                        (board.board[r1][c1] is None and board.board[r2][c2] == 'S')):
-                        potential_count += 1
-            # Tambahkan logika untuk S-O-? jika AI bisa menempatkan S, tapi di sini AI hanya 'O'
-            # Jadi, kita hanya fokus pada O sebagai huruf tengah.
+        s_bits = board.s_bits
+        empty = board.empty_mask
+        for before, after in pairs[row * board.size + col]:
+            if ((s_bits & before and empty & after) or
+                (empty & before and s_bits & after)):
+                potential_count += 1
         
         return potential_count
     
+    def _tt_store(self, key, depth, flag, score, best_move):
+        """Store a search result, keeping the deeper of two entries"""
+        entry = self._tt.get(key)
+        if entry is not None and entry[0] > depth:
+            return
+        if entry is None and len(self._tt) >= TT_MAX_ENTRIES:
+            self._tt.clear()
+        self._tt[key] = (depth, flag, score, best_move)
+    
     def _find_best_move_with_lookahead(self, board):
-        """Simple lookahead evaluation"""
-        empty_cells = board.get_empty_cells()
-        if not empty_cells:
+        """Iterative deepening alpha-beta search for the best 'O' move
+        
+        Each finished depth seeds the transposition table with best
+        moves for the next; once HARD_SEARCH_BUDGET runs out the last
+        finished depth's move is used.
+        """
+        if board.is_full():
             return None
         
+        deadline = time.perf_counter() + HARD_SEARCH_BUDGET
         best_move = None
-        best_score = float('-inf')
+        for depth in range(1, HARD_SEARCH_DEPTH + 1):
+            try:
+                # Depth 1 always finishes so there is a move to fall back on
+                _, move = self._negamax(board, depth, -SCORE_INF, SCORE_INF, 1,
+                                        deadline if depth > 1 else None)
+            except _SearchTimeout:
+                break
+            if move:
+                best_move = (move[0], move[1], self.letter)
         
-        for row, col in empty_cells:
-            # AI hanya mencoba menempatkan 'O'
-            test_board = board.copy()
-            immediate_score = test_board.make_move(row, col, self.letter, "AI")
-            
-            # Simple lookahead - check opponent's best response (lawan selalu 'S')
-            opponent_best = 0
-            for opp_row, opp_col in test_board.get_empty_cells()[:5]:  # Limit for performance
-                opp_board = test_board.copy()
-                opp_score = opp_board.make_move(opp_row, opp_col, 'S', "Human") # Lawan selalu 'S'
-                opponent_best = max(opponent_best, opp_score)
-            
-            total_score = immediate_score * 10 - opponent_best * 5 # AI memaksimalkan skornya dan meminimalkan skor lawan
+        return best_move
+    
+    def _negamax(self, board, depth, alpha, beta, color, deadline):
+        """Alpha-beta negamax, returns (score, (row, col)) for the side to move
+        
+        color is 1 when the AI ('O') moves and -1 for the opponent ('S');
+        score is the mover's points minus the other side's. Completing an
+        SOS earns another turn, so that child keeps the same color.
+        """
+        if depth == 0 or board.is_full():
+            return 0, None
+        if deadline is not None and time.perf_counter() > deadline:
+            raise _SearchTimeout
+        
+        alpha_orig = alpha
+        key = board.zobrist if color > 0 else board.zobrist ^ SOSBoard.ZOBRIST_SIDE
+        entry = self._tt.get(key)
+        tt_move = None
+        if entry is not None:
+            entry_depth, flag, value, tt_move = entry
+            if entry_depth >= depth:
+                if flag == TT_EXACT:
+                    return value, tt_move
+                if flag == TT_LOWER:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value, tt_move
+        
+        letter = self.letter if color > 0 else 'S'
+        best_score = -SCORE_INF
+        best_move = None
+        
+        for row, col in self._ordered_cells(board, tt_move):
+            points = board.make_move(row, col, letter)
+            try:
+                if points:
+                    score = points + self._search_child(board, depth - 1, alpha - points,
+                                                        beta - points, color, deadline)
+                else:
+                    score = -self._search_child(board, depth - 1, -beta, -alpha,
+                                                -color, deadline)
+            finally:
+                board.undo_last_move()
             
-            if total_score > best_score:
-                best_score = total_score
-                best_move = (row, col, self.letter) # Pastikan mengembalikan 'O'
+            if score > best_score:
+                best_score = score
+                best_move = (row, col)
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break  # Beta cutoff
+        
+        if best_score <= alpha_orig:
+            flag = TT_UPPER
+        elif best_score >= beta:
+            flag = TT_LOWER
+        else:
+            flag = TT_EXACT
+        self._tt_store(key, depth, flag, best_score, best_move)
         
-        return best_move
+        return best_score, best_move
+    
+    def _search_child(self, board, depth, alpha, beta, color, deadline):
+        """Score of a child position; shallow subtrees go to negamax_kernel
+        
+        Only with numba (the plain Python kernel is no faster than
+        _negamax), and only for boards that fit the kernel's int64 math.
+        """
+        if HAVE_NUMBA and depth <= KERNEL_DEPTH and board.size * board.size <= 62:
+            return negamax_kernel(board.s_bits, board.o_bits, board.empty_mask,
+                                  depth, alpha, beta, color, board._shifts)
+        return self._negamax(board, depth, alpha, beta, color, deadline)[0]
+    
+    def _ordered_cells(self, board, first=None):
+        """Empty cells to search: first (the TT move), then nearest the center"""
+        order = self._center_orders.get(board.size)
+        if order is None:
+            center = board.size // 2
+            cells = [(abs(row - center) + abs(col - center), row, col)
+                     for row in range(board.size) for col in range(board.size)]
+            order = self._center_orders[board.size] = tuple(
+                (row, col, 1 << (row * board.size + col)) for _, row, col in sorted(cells))
+        
+        empty = board.empty_mask
+        cells = [(row, col) for row, col, bit in order if empty & bit]
+        if first is not None and first in cells:
+            cells.remove(first)
+            cells.insert(0, first)
+        return cells
     
     def _get_random_move(self, board):
         """Fallback random move"""
@@ -460,16 +853,87 @@ class SoundManager:
     def toggle_sound(self):
         self.enabled = not self.enabled
 
+class ParticleSystem:
+    """Score particles stored as parallel numpy arrays (one slot per particle)
+    
+    Live particles occupy slots [0, count); dead ones are compacted out
+    on update, so every step is a handful of whole-array operations.
+    """
+    
+    def __init__(self, capacity=MAX_PARTICLES):
+        self.capacity = capacity
+        self.count = 0
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.vx = np.zeros(capacity, dtype=np.float32)
+        self.vy = np.zeros(capacity, dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.float32)
+        self.size = np.zeros(capacity, dtype=np.float32)
+        self.color = np.zeros((capacity, 3), dtype=np.uint8)
+        self._rng = np.random.default_rng()
+    
+    def __len__(self):
+        return self.count
+    
+    def clear(self):
+        self.count = 0
+    
+    def emit(self, x, y, color, amount):
+        """Spawn amount particles around (x, y); extras past capacity are dropped"""
+        start = self.count
+        end = min(start + amount, self.capacity)
+        amount = end - start
+        if amount <= 0:
+            return
+        
+        rng = self._rng
+        self.x[start:end] = x + rng.integers(-15, 16, amount)
+        self.y[start:end] = y + rng.integers(-15, 16, amount)
+        self.vx[start:end] = rng.uniform(-3, 3, amount)
+        self.vy[start:end] = rng.uniform(-5, -1, amount)
+        self.life[start:end] = PARTICLE_LIFE
+        self.size[start:end] = rng.integers(2, 6, amount)
+        self.color[start:end] = color
+        self.count = end
+    
+    def update(self):
+        n = self.count
+        if not n:
+            return
+        
+        self.x[:n] += self.vx[:n]
+        self.y[:n] += self.vy[:n]
+        self.vy[:n] += PARTICLE_GRAVITY
+        self.life[:n] -= 1
+        np.maximum(self.size[:n] - PARTICLE_SHRINK, 1, out=self.size[:n])
+        
+        alive = self.life[:n] > 0
+        live = int(np.count_nonzero(alive))
+        if live < n:
+            for array in (self.x, self.y, self.vx, self.vy, self.life, self.size, self.color):
+                array[:live] = array[:n][alive]
+            self.count = live
+
 class EnhancedSOSGame:
     def __init__(self):
         self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
         pygame.display.set_caption("Enhanced SOS Game - Modern Edition")
         self.clock = pygame.time.Clock()
         
+        # Only queue the events handle_events reacts to (VIDEOEXPOSE just
+        # forces a redraw); SDL drops the rest
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed([pygame.QUIT, pygame.MOUSEBUTTONDOWN,
+                                  pygame.MOUSEMOTION, pygame.KEYDOWN,
+                                  pygame.VIDEOEXPOSE])
+        
         # Game components
         self.board = SOSBoard()
         self.sound_manager = SoundManager()
         self.stats = self._load_stats()
+        # Stats change in memory during play and are written on exit
+        self._saved_stats = asdict(self.stats)
+        atexit.register(self._save_stats)
         
         # Game state
         self.game_mode = GameMode.HUMAN_VS_AI
@@ -484,13 +948,18 @@ class EnhancedSOSGame:
         self.hover_cell = None
         self.show_winner_animation = False
         self.winner_animation_time = 0
-        self.particles = []
-        self.hint_cells = []
+        self.particles = ParticleSystem()
+        self.hint_cells = set()
         self.show_hints = False
         
         # Timing
         self.ai_move_timer = 0
         self.ai_move_delay = 1500
+        # The AI thinks on a board copy in this worker while frames keep drawing
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._ai_future = None
+        self._kernels_warm = False
+        self._warm_up_ai()
         
         # Fonts
         self.font_large = pygame.font.Font(None, 48)
@@ -499,6 +968,43 @@ class EnhancedSOSGame:
         self.font_title = pygame.font.Font(None, 64)
         self.font_tiny = pygame.font.Font(None, 20)
         
+        # Rendered text surfaces, see _render
+        self._text_cache = {}
+        # Pulsing winner text fonts, one per WINNER_FONT_STEPS size step;
+        # loaded here so the animation never opens a font mid-frame
+        self._winner_fonts = tuple(
+            pygame.font.Font(None, int(64 * (0.7 + 0.6 * step / (WINNER_FONT_STEPS - 1))))
+            for step in range(WINNER_FONT_STEPS))
+        # Pre-drawn particle circles, see _particle_sprite
+        self._particle_sprites = {}
+        # Pre-drawn buttons, see _button_sprite
+        self._button_sprites = {}
+        # Pre-drawn letters with their shadow, see _letter_sprite
+        self._letter_sprites = {}
+        # Letter blits of the plain board and the (s_bits, o_bits) they show,
+        # see draw_enhanced_board
+        self._plain_letters_key = None
+        self._plain_letter_blits = []
+        # Move history panel and the (length, last move) it was drawn for
+        self._history_panel = None
+        self._history_key = None
+        
+        # Static background, drawn once instead of every frame
+        self.bg_surface = self._build_background()
+        # Board panel with its empty cells, same idea
+        self.board_surface, self.board_surface_pos = self._build_board_surface()
+        # Black full-window overlay for the winner animation; its surface
+        # alpha is set per frame, which blits faster than per-pixel alpha
+        self.overlay_surface = self._new_surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+        self.overlay_surface.fill((0, 0, 0))
+        # ((row, col), screen rect, board bit) of every cell, for draw_enhanced_board
+        self._cell_layout = tuple(
+            ((row, col),
+             pygame.Rect(BOARD_OFFSET_X + col * CELL_SIZE + 3, BOARD_OFFSET_Y + row * CELL_SIZE + 3,
+                         CELL_SIZE - 6, CELL_SIZE - 6),
+             1 << (row * BOARD_SIZE + col))
+            for row in range(BOARD_SIZE) for col in range(BOARD_SIZE))
+        
         # Enhanced buttons
         self.buttons = {
             'new_game': pygame.Rect(50, 50, 100, 35),
@@ -511,7 +1017,18 @@ class EnhancedSOSGame:
         
         # Highlighting
         self.sos_highlights = []
+        self._highlighted = set()  # tuple(seq) of each sos_highlights entry
+        self._sos_cells = set()  # every cell of every sos_highlights entry
         self.highlight_timer = 0
+        # Whether the last drawn board showed SOS highlights, see draw
+        self._highlight_drawn = False
+        
+        # Redraw tracking: state only changes on input or an AI move,
+        # animations need every frame while they run (plus one to clear)
+        self._dirty = True
+        self._was_animating = False
+        # Screen area the particles were last drawn in, see draw_particles
+        self._particle_rect = None
     
     def _load_stats(self):
         """Load game statistics from file"""
@@ -525,15 +1042,31 @@ class EnhancedSOSGame:
         return GameStats()
     
     def _save_stats(self):
-        """Save game statistics to file"""
+        """Save game statistics to file, if they changed since the last save"""
+        data = asdict(self.stats)
+        if data == self._saved_stats:
+            return
         try:
-            with open('sos_stats.json', 'w') as f:
-                json.dump(self.stats.__dict__, f)
+            if orjson is not None:
+                with open('sos_stats.json', 'wb') as f:
+                    f.write(orjson.dumps(data))
+            else:
+                with open('sos_stats.json', 'w') as f:
+                    json.dump(data, f)
+            self._saved_stats = data
         except:
             pass
     
-    def handle_events(self):
-        for event in pygame.event.get():
+    def handle_events(self, woken=None):
+        """Process queued input; woken is an event already taken by event.wait"""
+        events = pygame.event.get()
+        if woken is not None:
+            events.insert(0, woken)
+        if events:
+            self._dirty = True
+        # Only the last motion of the frame matters for the hover cell
+        motion_pos = None
+        for event in events:
             if event.type == pygame.QUIT:
                 self._save_stats()
                 return False
@@ -543,7 +1076,7 @@ class EnhancedSOSGame:
                     self.handle_click(event.pos)
             
             elif event.type == pygame.MOUSEMOTION:
-                self.handle_mouse_move(event.pos)
+                motion_pos = event.pos
             
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_n:
@@ -560,6 +1093,9 @@ class EnhancedSOSGame:
                     self._save_stats()
                     return False
         
+        if motion_pos is not None:
+            self.handle_mouse_move(motion_pos)
+        
         return True
     
     def handle_click(self, pos):
@@ -650,6 +1186,7 @@ class EnhancedSOSGame:
         self.current_player = self.human_player
         self.game_over = False
         self.winner = None
+        self.cancel_ai_move()
         self.hide_hints()
     
     def toggle_hints(self):
@@ -665,13 +1202,13 @@ class EnhancedSOSGame:
             return
         
         possible_moves = self.board.get_possible_sos_moves()
-        self.hint_cells = [(row, col) for row, col, letter, count in possible_moves 
-                           if letter == 'S']  # Only show S moves for human
+        self.hint_cells = {(row, col) for row, col, letter, count in possible_moves 
+                           if letter == 'S'}  # Only show S moves for human
         self.show_hints = True
     
     def hide_hints(self):
         """Hide hints"""
-        self.hint_cells = []
+        self.hint_cells = set()
         self.show_hints = False
     
     def cycle_difficulty(self):
@@ -683,6 +1220,8 @@ class EnhancedSOSGame:
         
         # Update AI player
         self.ai_player = EnhancedAI(self.difficulty)
+        self.cancel_ai_move()
+        self._warm_up_ai()
         
         # Reset game if in progress
         if not self.game_over and len(self.board.move_history) > 0:
@@ -695,19 +1234,47 @@ class EnhancedSOSGame:
               f"AI Wins: {self.stats.ai_wins}, Draws: {self.stats.draws}")
     
     def update_ai(self):
-        """Update AI logic"""
-        if (self.current_player == self.ai_player and 
-            not self.game_over and 
+        """Update AI logic
+        
+        The move is computed in the background as soon as it is the AI's
+        turn and played once it is ready and ai_move_delay has passed.
+        """
+        if self.current_player != self.ai_player or self.game_over:
+            return
+        
+        if self._ai_future is None:
+            self._ai_future = self._executor.submit(self.ai_player.get_move,
+                                                    self.board.copy())
+        
+        if (self._ai_future.done() and
             pygame.time.get_ticks() - self.ai_move_timer > self.ai_move_delay):
-            
-            self.ai_move()
+            future = self._ai_future
+            self._ai_future = None
+            self.ai_move(future.result())
+    
+    def _warm_up_ai(self):
+        """Compile the hard AI's numba kernels on the AI worker, once
+        
+        The worker runs one job at a time, so the first hard move simply
+        queues behind the compile instead of freezing the UI.
+        """
+        if HAVE_NUMBA and self.difficulty == Difficulty.HARD and not self._kernels_warm:
+            self._executor.submit(warm_up_kernels)
+            self._kernels_warm = True
     
-    def ai_move(self):
+    def cancel_ai_move(self):
+        """Drop a pending background AI move (the board it saw is stale)"""
+        self._ai_future = None
+    
+    def ai_move(self, move=None):
         if self.game_over:
             return
         
         # Panggil get_move dari ai_player yang sudah dipastikan hanya mengembalikan 'O'
-        row, col, letter = self.ai_player.get_move(self.board)
+        if move is None:
+            move = self.ai_player.get_move(self.board)
+        row, col, letter = move
+        self._dirty = True
         
         if row is not None:
             points = self.board.make_move(row, col, letter, self.ai_player.name)
@@ -731,7 +1298,10 @@ class EnhancedSOSGame:
     def highlight_new_sos(self):
         # Add new SOS sequences to highlights
         for seq in self.board.sos_sequences:
-            if seq not in self.sos_highlights:
+            key = tuple(seq)
+            if key not in self._highlighted:
+                self._highlighted.add(key)
+                self._sos_cells.update(key)
                 self.sos_highlights.append(seq)
         self.highlight_timer = pygame.time.get_ticks()
     
@@ -745,28 +1315,10 @@ class EnhancedSOSGame:
         else:
             color = COLORS['letter_o']
         
-        for i in range(points * 8):
-            particle = {
-                'x': x + random.randint(-15, 15),
-                'y': y + random.randint(-15, 15),
-                'vx': random.uniform(-3, 3),
-                'vy': random.uniform(-5, -1),
-                'life': 80,
-                'color': color,
-                'size': random.randint(2, 5)
-            }
-            self.particles.append(particle)
+        self.particles.emit(x, y, color, points * 8)
     
     def update_particles(self):
-        for particle in self.particles[:]:
-            particle['x'] += particle['vx']
-            particle['y'] += particle['vy']
-            particle['vy'] += 0.15  # Gravity
-            particle['life'] -= 1
-            particle['size'] = max(1, particle['size'] - 0.05)
-            
-            if particle['life'] <= 0:
-                self.particles.remove(particle)
+        self.particles.update()
     
     def new_game(self):
         self.board = SOSBoard()
@@ -776,9 +1328,12 @@ class EnhancedSOSGame:
         self.game_over = False
         self.winner = None
         self.sos_highlights = []
-        self.particles = []
+        self._highlighted = set()
+        self._sos_cells = set()
+        self.particles.clear()
         self.show_winner_animation = False
         self.ai_move_timer = 0
+        self.cancel_ai_move()
         self.hide_hints()
     
     def end_game(self):
@@ -800,9 +1355,43 @@ class EnhancedSOSGame:
         
         self.show_winner_animation = True
         self.winner_animation_time = pygame.time.get_ticks()
-        self._save_stats()
     
-    def draw(self):
+    def _render(self, font, text, color):
+        """font.render(text, True, color), cached by (font, text, color)"""
+        key = (id(font), text, color)
+        surface = self._text_cache.get(key)
+        if surface is None:
+            if len(self._text_cache) >= TEXT_CACHE_SIZE:
+                self._text_cache.clear()
+            surface = self._text_cache[key] = font.render(text, True, color).convert_alpha()
+        return surface
+    
+    def _new_surface(self, size, alpha=False):
+        """Surface already in the display's pixel format, so blits skip conversion
+        
+        Every cached surface is made here; alpha=True gives per-pixel alpha.
+        """
+        if alpha:
+            return pygame.Surface(size, pygame.SRCALPHA).convert_alpha()
+        return pygame.Surface(size).convert()
+    
+    def _is_animating(self):
+        """Whether anything on screen moves on its own this frame"""
+        now = pygame.time.get_ticks()
+        return (len(self.particles) > 0 or
+                (self.sos_highlights and now - self.highlight_timer < 3000) or
+                (self.show_winner_animation and now - self.winner_animation_time < 4000))
+    
+    def draw(self, full=True):
+        """Redraw the frame and present it
+        
+        With full=False only the areas that animate (particles, the board
+        while SOS highlights show) are pushed to the display; the caller
+        uses it for frames where no input or move happened.
+        """
+        last_particle_rect = self._particle_rect
+        last_highlight_drawn = self._highlight_drawn
+        
         # Clear screen with enhanced gradient
         self.draw_enhanced_background()
         
@@ -831,9 +1420,23 @@ class EnhancedSOSGame:
         if self.show_winner_animation:
             self.draw_winner_animation()
         
-        pygame.display.flip()
+        if full or self.show_winner_animation:
+            pygame.display.flip()
+            return
+        
+        dirty_rects = [rect for rect in (last_particle_rect, self._particle_rect) if rect]
+        # The board while a highlight fades, and once more to erase it
+        if self._highlight_drawn or last_highlight_drawn:
+            dirty_rects.append(self.board_surface.get_rect(topleft=self.board_surface_pos))
+        pygame.display.update(dirty_rects)
     
     def draw_enhanced_background(self):
+        self.screen.blit(self.bg_surface, (0, 0))
+    
+    def _build_background(self):
+        """Render the static gradient and pattern once, for draw_enhanced_background"""
+        surface = self._new_surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+        
         # More sophisticated gradient
         for y in range(WINDOW_HEIGHT):
             ratio = y / WINDOW_HEIGHT
@@ -841,25 +1444,26 @@ class EnhancedSOSGame:
             g = int(32 + (45 - 32) * ratio + 3 * math.cos(ratio * 3.14159))
             b = int(39 + (60 - 39) * ratio + 2 * math.sin(ratio * 6.28318))
             color = (max(0, min(255, r)), max(0, min(255, g)), max(0, min(255, b)))
-            pygame.draw.line(self.screen, color, (0, y), (WINDOW_WIDTH, y))
+            pygame.draw.line(surface, color, (0, y), (WINDOW_WIDTH, y))
         
         # Add subtle pattern
+        overlay = self._new_surface((50, 50))
+        overlay.set_alpha(10)
+        overlay.fill((255, 255, 255))
         for i in range(0, WINDOW_WIDTH, 100):
             for j in range(0, WINDOW_HEIGHT, 100):
-                alpha = 10
-                overlay = pygame.Surface((50, 50))
-                overlay.set_alpha(alpha)
-                overlay.fill((255, 255, 255))
-                self.screen.blit(overlay, (i, j))
+                surface.blit(overlay, (i, j))
+        
+        return surface
     
     def draw_title(self):
-        title_text = self.font_title.render("Enhanced SOS Game", True, COLORS['text_primary'])
+        title_text = self._render(self.font_title, "Enhanced SOS Game", COLORS['text_primary'])
         title_rect = title_text.get_rect(center=(WINDOW_WIDTH // 2, 120))
         self.screen.blit(title_text, title_rect)
         
         # Subtitle
         subtitle = f"Human (S) vs AI-{self.difficulty.value} (O)"
-        subtitle_text = self.font_small.render(subtitle, True, COLORS['text_secondary'])
+        subtitle_text = self._render(self.font_small, subtitle, COLORS['text_secondary'])
         subtitle_rect = subtitle_text.get_rect(center=(WINDOW_WIDTH // 2, 150))
         self.screen.blit(subtitle_text, subtitle_rect)
     
@@ -874,81 +1478,146 @@ class EnhancedSOSGame:
             ('quit', "Quit", COLORS['accent_red'])
         ]
         
+        button_blits = []
         for key, text, base_color in button_configs:
             rect = self.buttons[key]
-            color = self.lighten_color(base_color, 30) if rect.collidepoint(mouse_pos) else base_color
-            
-            pygame.draw.rect(self.screen, color, rect, border_radius=8)
-            pygame.draw.rect(self.screen, COLORS['text_primary'], rect, 2, border_radius=8)
-            
-            text_surface = self.font_tiny.render(text, True, COLORS['text_primary'])
-            text_rect = text_surface.get_rect(center=rect.center)
-            self.screen.blit(text_surface, text_rect)
+            hovered = rect.collidepoint(mouse_pos)
+            sprite = self._button_sprites.get((key, text, hovered))
+            if sprite is None:
+                sprite = self._button_sprite(key, text, base_color, hovered)
+            button_blits.append((sprite, rect.topleft))
+        self.screen.blits(button_blits, doreturn=False)
     
-    def lighten_color(self, color, amount):
-        return tuple(min(255, c + amount) for c in color)
+    def _button_sprite(self, key, text, base_color, hovered):
+        """Button face with its border and label, drawn over the background behind it"""
+        rect = self.buttons[key]
+        sprite = self.bg_surface.subsurface(rect).copy()
+        local_rect = sprite.get_rect()
+        color = LIGHTENED[base_color] if hovered else base_color
+        
+        pygame.draw.rect(sprite, color, local_rect, border_radius=8)
+        pygame.draw.rect(sprite, COLORS['text_primary'], local_rect, 2, border_radius=8)
+        
+        text_surface = self._render(self.font_tiny, text, COLORS['text_primary'])
+        text_rect = text_surface.get_rect(center=local_rect.center)
+        sprite.blit(text_surface, text_rect)
+        
+        self._button_sprites[key, text, hovered] = sprite
+        return sprite
     
-    def draw_enhanced_board(self):
+    def _build_board_surface(self):
+        """Render the board panel and default-colored cells once, for draw_enhanced_board
+        
+        Returns the surface and its screen position. The corners show the
+        background behind the panel, so the surface is opaque.
+        """
+        area = pygame.Rect(BOARD_OFFSET_X - 10, BOARD_OFFSET_Y - 10,
+                           BOARD_SIZE * CELL_SIZE + 25, BOARD_SIZE * CELL_SIZE + 25)
+        surface = self.bg_surface.subsurface(area).copy()
+        
         # Enhanced board background with shadow
-        shadow_rect = pygame.Rect(BOARD_OFFSET_X - 5, BOARD_OFFSET_Y - 5, 
-                                  BOARD_SIZE * CELL_SIZE + 20, BOARD_SIZE * CELL_SIZE + 20)
-        pygame.draw.rect(self.screen, (0, 0, 0, 50), shadow_rect, border_radius=15)
+        shadow_rect = pygame.Rect(5, 5, BOARD_SIZE * CELL_SIZE + 20, BOARD_SIZE * CELL_SIZE + 20)
+        pygame.draw.rect(surface, (0, 0, 0, 50), shadow_rect, border_radius=15)
         
-        board_rect = pygame.Rect(BOARD_OFFSET_X - 10, BOARD_OFFSET_Y - 10, 
-                                 BOARD_SIZE * CELL_SIZE + 20, BOARD_SIZE * CELL_SIZE + 20)
-        pygame.draw.rect(self.screen, COLORS['board'], board_rect, border_radius=15)
+        board_rect = pygame.Rect(0, 0, BOARD_SIZE * CELL_SIZE + 20, BOARD_SIZE * CELL_SIZE + 20)
+        pygame.draw.rect(surface, COLORS['board'], board_rect, border_radius=15)
         
-        # Draw cells with enhanced styling
         for row in range(BOARD_SIZE):
             for col in range(BOARD_SIZE):
-                x = BOARD_OFFSET_X + col * CELL_SIZE
-                y = BOARD_OFFSET_Y + row * CELL_SIZE
-                
-                cell_rect = pygame.Rect(x + 3, y + 3, CELL_SIZE - 6, CELL_SIZE - 6)
-                
-                # Determine cell color
-                color = COLORS['cell']
-                
-                if self.hover_cell == (row, col) and not self.game_over:
-                    color = COLORS['cell_hover']
-                
-                # Hint highlighting
-                if (row, col) in self.hint_cells:
-                    color = COLORS['hint_highlight']
-                
-                # SOS highlighting
-                current_time = pygame.time.get_ticks()
-                if current_time - self.highlight_timer < 3000:
-                    for seq in self.sos_highlights:
-                        if (row, col) in seq:
-                            color = COLORS['sos_highlight']
-                            break
-                
-                pygame.draw.rect(self.screen, color, cell_rect, border_radius=10)
+                cell_rect = pygame.Rect(10 + col * CELL_SIZE + 3, 10 + row * CELL_SIZE + 3,
+                                        CELL_SIZE - 6, CELL_SIZE - 6)
+                pygame.draw.rect(surface, COLORS['cell'], cell_rect, border_radius=10)
+                pygame.draw.rect(surface, COLORS['grid_line'], cell_rect, 2, border_radius=10)
+        
+        return surface, area.topleft
+    
+    def draw_enhanced_board(self):
+        # Panel and default cells come from the pre-rendered board surface;
+        # only cells in another color are drawn over it
+        self.screen.blit(self.board_surface, self.board_surface_pos)
+        
+        # Per-frame state read once, not per cell
+        now = pygame.time.get_ticks()
+        sos_cells = self._sos_cells if now - self.highlight_timer < 3000 else ()
+        self._highlight_drawn = bool(sos_cells)
+        hints = self.hint_cells
+        hover = None if self.game_over else self.hover_cell
+        screen = self.screen
+        grid_color = COLORS['grid_line']
+        # Letters read straight from the bitboards rather than get_cell per cell
+        s_bits = self.board.s_bits
+        o_bits = self.board.o_bits
+        
+        # With no highlight, hint or hover every cell has the default color
+        # the board surface already shows, and only the letters are drawn;
+        # their blit list is kept for as long as the letters stay the same
+        plain = not sos_cells and not hints and hover is None
+        if plain and self._plain_letters_key == (s_bits, o_bits):
+            screen.blits(self._plain_letter_blits, doreturn=False)
+            return
+        
+        # Letter and hint text, blitted in one blits call after the cells
+        text_blits = []
+        
+        # Draw cells with enhanced styling
+        for cell, cell_rect, bit in self._cell_layout:
+            # Determine cell color: SOS highlight, then hint, then hover
+            if cell in sos_cells:
+                color = COLORS['sos_highlight']
+            elif cell in hints:
+                color = COLORS['hint_highlight']
+            elif cell == hover:
+                color = COLORS['cell_hover']
+            else:
+                color = None
+            
+            if color is not None:
+                pygame.draw.rect(screen, color, cell_rect, border_radius=10)
                 
                 # Add subtle border
-                pygame.draw.rect(self.screen, COLORS['grid_line'], cell_rect, 2, border_radius=10)
-                
-                # Draw letter with enhanced styling
-                letter = self.board.get_cell(row, col)
-                if letter:
-                    letter_color = COLORS['letter_s'] if letter == 'S' else COLORS['letter_o']
-                    
-                    # Add letter shadow
-                    shadow_text = self.font_large.render(letter, True, (0, 0, 0))
-                    shadow_rect = shadow_text.get_rect(center=(cell_rect.centerx + 2, cell_rect.centery + 2))
-                    self.screen.blit(shadow_text, shadow_rect)
-                    
-                    # Main letter
-                    text = self.font_large.render(letter, True, letter_color)
-                    text_rect = text.get_rect(center=cell_rect.center)
-                    self.screen.blit(text, text_rect)
-                
-                # Draw hint indicators
-                elif (row, col) in self.hint_cells:
-                    hint_text = self.font_medium.render("S", True, COLORS['text_secondary'])
-                    hint_rect = hint_text.get_rect(center=cell_rect.center)
-                    self.screen.blit(hint_text, hint_rect)
+                pygame.draw.rect(screen, grid_color, cell_rect, 2, border_radius=10)
+            else:
+                color = COLORS['cell']
+            
+            # Draw letter with enhanced styling
+            letter = 'S' if s_bits & bit else 'O' if o_bits & bit else None
+            if letter:
+                entry = self._letter_sprites.get((letter, color))
+                if entry is None:
+                    entry = self._letter_sprite(letter, color)
+                sprite, (dx, dy) = entry
+                text_blits.append((sprite, (cell_rect.centerx + dx, cell_rect.centery + dy)))
+            
+            # Draw hint indicators
+            elif cell in hints:
+                hint_text = self._render(self.font_medium, "S", COLORS['text_secondary'])
+                hint_rect = hint_text.get_rect(center=cell_rect.center)
+                text_blits.append((hint_text, hint_rect))
+        
+        if plain:
+            self._plain_letters_key = (s_bits, o_bits)
+            self._plain_letter_blits = text_blits
+        self.screen.blits(text_blits, doreturn=False)
+    
+    def _letter_sprite(self, letter, background):
+        """Letter with its shadow on an opaque patch of the cell color
+        
+        Returns (sprite, offset of its top-left from the cell center). The
+        patch starts where the centered letter does; the shadow sits 2px
+        right of and below it, so the patch is 2px larger than the glyph.
+        """
+        letter_color = COLORS['letter_s'] if letter == 'S' else COLORS['letter_o']
+        shadow_text = self._render(self.font_large, letter, (0, 0, 0))
+        text = self._render(self.font_large, letter, letter_color)
+        
+        width, height = text.get_size()
+        sprite = self._new_surface((width + 2, height + 2))
+        sprite.fill(background)
+        sprite.blit(shadow_text, (2, 2))
+        sprite.blit(text, (0, 0))
+        
+        entry = self._letter_sprites[letter, background] = (sprite, (-(width // 2), -(height // 2)))
+        return entry
     
     def draw_enhanced_scores(self):
         # Score panel background
@@ -960,20 +1629,20 @@ class EnhancedSOSGame:
         human_text = f"Human (S): {self.human_player.score}"
         ai_text = f"AI (O): {self.ai_player.score}"
         
-        human_surface = self.font_medium.render(human_text, True, COLORS['letter_s'])
-        ai_surface = self.font_medium.render(ai_text, True, COLORS['letter_o'])
+        human_surface = self._render(self.font_medium, human_text, COLORS['letter_s'])
+        ai_surface = self._render(self.font_medium, ai_text, COLORS['letter_o'])
         
         self.screen.blit(human_surface, (60, 760))
         self.screen.blit(ai_surface, (60, 790))
         
         # Game stats
         stats_text = f"Games: {self.stats.games_played} | Wins: {self.stats.human_wins} | Best: {self.stats.best_score}"
-        stats_surface = self.font_small.render(stats_text, True, COLORS['text_secondary'])
+        stats_surface = self._render(self.font_small, stats_text, COLORS['text_secondary'])
         self.screen.blit(stats_surface, (60, 820))
         
         # Total SOS formed
         sos_text = f"Total SOS: {len(self.board.sos_sequences)} | All-time SOS: {self.stats.total_sos_formed}"
-        sos_surface = self.font_small.render(sos_text, True, COLORS['text_secondary'])
+        sos_surface = self._render(self.font_small, sos_text, COLORS['text_secondary'])
         self.screen.blit(sos_surface, (60, 840))
     
     def draw_game_info(self):
@@ -996,54 +1665,104 @@ class EnhancedSOSGame:
                 status = "🤝 It's a Draw! 🤝"
                 color = COLORS['accent_orange']
         
-        status_surface = self.font_medium.render(status, True, color)
+        status_surface = self._render(self.font_medium, status, color)
         status_rect = status_surface.get_rect(center=(WINDOW_WIDTH // 2, 780))
         self.screen.blit(status_surface, status_rect)
         
         # Additional info
         if self.show_hints and self.hint_cells:
             hint_info = f"💡 {len(self.hint_cells)} possible SOS moves shown"
-            hint_surface = self.font_small.render(hint_info, True, COLORS['hint_highlight'])
+            hint_surface = self._render(self.font_small, hint_info, COLORS['hint_highlight'])
             hint_rect = hint_surface.get_rect(center=(WINDOW_WIDTH // 2, 810))
             self.screen.blit(hint_surface, hint_rect)
     
     def draw_particles(self):
-        for particle in self.particles:
-            if particle['life'] > 0:
-                alpha = int(255 * (particle['life'] / 80))
-                size = max(1, int(particle['size']))
-                
-                # Create surface with per-pixel alpha
-                particle_surface = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
-                color_with_alpha = (*particle['color'], alpha)
-                pygame.draw.circle(particle_surface, color_with_alpha, (size, size), size)
-                
-                self.screen.blit(particle_surface, 
-                                 (int(particle['x'] - size), int(particle['y'] - size)))
+        particles = self.particles
+        n = particles.count
+        if not n:
+            self._particle_rect = None
+            return
+        
+        # Per-particle values computed for all live slots at once; alpha is
+        # cut to 16 levels so a few dozen sprites cover every particle
+        alphas = (255 * (particles.life[:n] / PARTICLE_LIFE)).astype(np.int32) >> 4
+        # Level 0 is fully transparent: those particles are not blitted at all
+        visible = np.flatnonzero(alphas)
+        if not visible.size:
+            self._particle_rect = None
+            return
+        alphas = alphas[visible]
+        sizes = np.maximum(particles.size[visible].astype(np.int32), 1)
+        lefts = (particles.x[visible] - sizes).astype(np.int32)
+        tops = (particles.y[visible] - sizes).astype(np.int32)
+        left, top = int(lefts.min()), int(tops.min())
+        self._particle_rect = pygame.Rect(left, top,
+                                          int((lefts + 2 * sizes).max()) - left,
+                                          int((tops + 2 * sizes).max()) - top)
+        lefts = lefts.tolist()
+        tops = tops.tolist()
+        color = particles.color[visible].astype(np.int32)
+        colors = (color[:, 0] << 16) | (color[:, 1] << 8) | color[:, 2]
+        keys = zip(colors.tolist(), sizes.tolist(), alphas.tolist())
+        
+        sprites = self._particle_sprites
+        blits = []
+        for key, left, top in zip(keys, lefts, tops):
+            sprite = sprites.get(key)
+            if sprite is None:
+                sprite = self._particle_sprite(key)
+            blits.append((sprite, (left, top)))
+        self.screen.blits(blits, doreturn=False)
+    
+    def _particle_sprite(self, key):
+        """Circle surface for a (packed rgb, radius, alpha level) particle key"""
+        rgb, size, level = key
+        color = (rgb >> 16, (rgb >> 8) & 0xFF, rgb & 0xFF, level * 17)
+        sprite = self._new_surface((size * 2, size * 2), alpha=True)
+        pygame.draw.circle(sprite, color, (size, size), size)
+        self._particle_sprites[key] = sprite
+        return sprite
     
     def draw_move_history(self):
-        # Move history panel
-        if len(self.board.move_history) > 0:
-            history_rect = pygame.Rect(720, 200, 250, 500)
-            pygame.draw.rect(self.screen, COLORS['board'], history_rect, border_radius=10)
-            pygame.draw.rect(self.screen, COLORS['text_primary'], history_rect, 2, border_radius=10)
+        # Move history panel, rebuilt only when the history changes
+        history = self.board.move_history
+        if len(history) > 0:
+            key = (len(history), history[-1])
+            if (self._history_panel is None or self._history_key[0] != key[0] or
+                    self._history_key[1] is not key[1]):
+                self._history_panel = self._build_history_panel(history)
+                self._history_key = key
+            self.screen.blit(self._history_panel, (720, 200))
+    
+    def _build_history_panel(self, history):
+        """Panel with the title and the last 15 moves, for draw_move_history"""
+        panel = self._new_surface((250, 500), alpha=True)
+        history_rect = panel.get_rect()
+        pygame.draw.rect(panel, COLORS['board'], history_rect, border_radius=10)
+        pygame.draw.rect(panel, COLORS['text_primary'], history_rect, 2, border_radius=10)
+        
+        # Title
+        title_text = self._render(self.font_medium, "Move History", COLORS['text_primary'])
+        panel.blit(title_text, (10, 10))
+        
+        # Recent moves (last 15)
+        recent_moves = history[-15:]
+        move_blits = []
+        for i, move in enumerate(recent_moves):
+            y_pos = 40 + i * 25
+            player_color = COLORS['letter_s'] if move.player == "Human" else COLORS['letter_o']
             
-            # Title
-            title_text = self.font_medium.render("Move History", True, COLORS['text_primary'])
-            self.screen.blit(title_text, (730, 210))
+            move_text = f"{move.player}: {move.letter} at ({move.row},{move.col})"
+            if move.sos_formed > 0:
+                move_text += f" +{move.sos_formed}"
             
-            # Recent moves (last 15)
-            recent_moves = self.board.move_history[-15:]
-            for i, move in enumerate(recent_moves):
-                y_pos = 240 + i * 25
-                player_color = COLORS['letter_s'] if move.player == "Human" else COLORS['letter_o']
-                
-                move_text = f"{move.player}: {move.letter} at ({move.row},{move.col})"
-                if move.sos_formed > 0:
-                    move_text += f" +{move.sos_formed}"
-                
-                move_surface = self.font_tiny.render(move_text, True, player_color)
-                self.screen.blit(move_surface, (730, y_pos))
+            move_surface = self._render(self.font_tiny, move_text, player_color)
+            move_blits.append((move_surface, (10, y_pos)))
+        panel.blits(move_blits, doreturn=False)
+        
+        # RLE makes blitting the mostly opaque panel about as cheap as a copy
+        panel.set_alpha(255, pygame.RLEACCEL)
+        return panel
     
     def draw_winner_animation(self):
         current_time = pygame.time.get_ticks()
@@ -1052,9 +1771,8 @@ class EnhancedSOSGame:
         if animation_duration < 4000:  # Show for 4 seconds
             # Pulsing overlay
             pulse = abs(math.sin(animation_duration / 200)) * 100 + 50
-            overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SRCALPHA)
-            overlay.fill((0, 0, 0, pulse))
-            self.screen.blit(overlay, (0, 0))
+            self.overlay_surface.set_alpha(int(pulse))
+            self.screen.blit(self.overlay_surface, (0, 0))
             
             # Winner text with effects
             if self.winner == "Human":
@@ -1067,26 +1785,30 @@ class EnhancedSOSGame:
                 winner_text = "🤝 PERFECT BALANCE 🤝"
                 color = COLORS['accent_orange']
             
-            # Animated text size
+            # Animated text size, in WINNER_FONT_STEPS steps so the fonts and
+            # their rendered text can be reused instead of built every frame
             size_multiplier = 1 + 0.3 * math.sin(animation_duration / 150)
-            big_font = pygame.font.Font(None, int(64 * size_multiplier))
+            step = round((size_multiplier - 0.7) / 0.6 * (WINNER_FONT_STEPS - 1))
+            big_font = self._winner_fonts[step]
             
-            winner_surface = big_font.render(winner_text, True, color)
+            winner_surface = self._render(big_font, winner_text, color)
             winner_rect = winner_surface.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2))
             self.screen.blit(winner_surface, winner_rect)
             
             # Score summary
             score_text = f"Final Score - Human: {self.human_player.score} | AI: {self.ai_player.score}"
-            score_surface = self.font_medium.render(score_text, True, COLORS['text_primary'])
+            score_surface = self._render(self.font_medium, score_text, COLORS['text_primary'])
             score_rect = score_surface.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 + 80))
             self.screen.blit(score_surface, score_rect)
     
     def run(self):
         running = True
+        woken = None
         
         while running:
             # Handle events
-            running = self.handle_events()
+            running = self.handle_events(woken)
+            woken = None
             
             # Update AI
             self.update_ai()
@@ -1094,12 +1816,26 @@ class EnhancedSOSGame:
             # Update particles
             self.update_particles()
             
-            # Draw everything
-            self.draw()
+            # Draw everything, unless nothing on screen could have changed;
+            # frames redrawn only for animations present just the moving parts
+            animating = self._is_animating()
+            if self._dirty:
+                self.draw()
+                self._dirty = False
+            elif animating or self._was_animating:
+                self.draw(full=False)
+            self._was_animating = animating
             
-            # Control frame rate
-            self.clock.tick(60)
+            # Control frame rate; with nothing animating and no AI move due,
+            # sleep until the next event instead (handled first next loop)
+            if animating or (self.current_player == self.ai_player and not self.game_over):
+                self.clock.tick(60)
+            else:
+                event = pygame.event.wait(IDLE_WAIT_MS)
+                if event.type != pygame.NOEVENT:
+                    woken = event
         
+        self._executor.shutdown(wait=False, cancel_futures=True)
         pygame.quit()
         sys.exit()
 
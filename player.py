@@ -3,8 +3,13 @@ SOS Game Player Classes - Pygame Version
 Mengelola input dan aksi pemain untuk pygame
 """
 
+from collections import deque
+from typing import NamedTuple
+
 class Player:
     """Base player class"""
+    __slots__ = ('name', 'score')
+    
     def __init__(self, name):
         self.name = name
         self.score = 0
@@ -23,6 +28,8 @@ class Player:
 
 class HumanPlayer(Player):
     """Human player class"""
+    __slots__ = ('preferred_letter',)
+    
     def __init__(self, name="Human"):
         super().__init__(name)
         self.preferred_letter = 'S'  # Default preference
@@ -78,35 +85,48 @@ class HumanPlayer(Player):
             'type': 'Human'
         }
 
+class SessionMove(NamedTuple):
+    """One move in GameSession.moves_history"""
+    player: str
+    row: int
+    col: int
+    letter: str
+    points: int
+    move_number: int
+    
+    def as_dict(self):
+        """The move in the dict form GameSession has always returned"""
+        return {
+            'player': self.player,
+            'position': (self.row, self.col),
+            'letter': self.letter,
+            'points': self.points,
+            'move_number': self.move_number
+        }
+
 class GameSession:
     """Manages game session data"""
     def __init__(self):
-        self.moves_history = []
+        self.moves_history = deque()
         self.game_start_time = None
         self.game_end_time = None
     
     def add_move(self, player_name, row, col, letter, points_scored):
         """Add move to history"""
-        move = {
-            'player': player_name,
-            'position': (row, col),
-            'letter': letter,
-            'points': points_scored,
-            'move_number': len(self.moves_history) + 1
-        }
-        self.moves_history.append(move)
+        self.moves_history.append(SessionMove(player_name, row, col, letter, points_scored,
+                                              len(self.moves_history) + 1))
     
     def get_move_history(self):
-        """Get complete move history"""
-        return self.moves_history
+        """Get complete move history, as a list of move dicts"""
+        return [move.as_dict() for move in self.moves_history]
     
     def get_last_move(self):
-        """Get the last move made"""
-        return self.moves_history[-1] if self.moves_history else None
+        """Get the last move made, as a move dict"""
+        return self.moves_history[-1].as_dict() if self.moves_history else None
     
     def clear_history(self):
         """Clear move history"""
-        self.moves_history = []
+        self.moves_history = deque()
     
     def get_total_moves(self):
         """Get total number of moves"""
@@ -116,9 +136,9 @@ class GameSession:
         """Display move history"""
         print("\n=== Move History ===")
         for move in self.moves_history:
-            print(f"Move {move['move_number']}: {move['player']} placed '{move['letter']}' "
-                  f"at ({move['position'][0]}, {move['position'][1]}) - "
-                  f"Points: {move['points']}")
+            print(f"Move {move.move_number}: {move.player} placed '{move.letter}' "
+                  f"at ({move.row}, {move.col}) - "
+                  f"Points: {move.points}")
 
 class InputValidator:
     """Validates user input for the game"""
@@ -0,0 +1,25 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from ai import AIPlayer
+from board import SOSBoard
+
+
+class LargeBoardTest(unittest.TestCase):
+    """Boards over 62 cells do not fit the numba kernels' int64 masks"""
+
+    def test_search_on_boards_wider_than_62_bits(self):
+        for size in (8, 9):
+            for difficulty in ("medium", "hard"):
+                board = SOSBoard(size)
+                board.make_move(0, 0, 'S')
+                board.make_move(0, 1, 'O')
+                move = AIPlayer("AI", difficulty, seed=0).get_move(board)
+                self.assertEqual(move, (0, 2, 'S'))  # completes S-O-S
+
+
+if __name__ == "__main__":
+    unittest.main()